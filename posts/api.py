@@ -0,0 +1,160 @@
+"""JSON API только для чтения: ленты, профиль и пост.
+
+Запросы те же, что у HTML-видов (feed.posts), страницы курсорные:
+?cursor= из поля next, ?limit= — размер страницы, ?fields= — поля
+постов через запятую. Страница ответа пишется в поток по одному
+посту, весь JSON в памяти не собирается.
+"""
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from . import conditional, counters, feed
+from .models import Group
+from .paginator import CursorPaginator, InvalidCursor
+
+User = get_user_model()
+
+FIELDS = {
+    'id': lambda post: post.id,
+    'url': lambda post: reverse('post', args=[post.author.username, post.id]),
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'updated': lambda post: post.updated.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group_id else None,
+    'image': lambda post: post.image.url if post.image else None,
+    'comments_count': lambda post: post.comments_count,
+}
+DEFAULT_FIELDS = (
+    'id', 'text', 'pub_date', 'author', 'group', 'comments_count',
+)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _fields(request):
+    raw = request.GET.get('fields')
+    if not raw:
+        return DEFAULT_FIELDS
+    names = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in names if name not in FIELDS]
+    if unknown:
+        raise BadRequest('Неизвестные поля: {}'.format(', '.join(unknown)))
+    return names
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest('limit должен быть числом')
+    return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def _serialize(post, fields):
+    return {name: FIELDS[name](post) for name in fields}
+
+
+def _stream(head, page, fields):
+    """{**head, "items": [...], "next": курсор} кусками по посту."""
+    yield _dumps(head)[:-1] + (',' if head else '') + '"items":['
+    for index, post in enumerate(page):
+        yield (',' if index else '') + _dumps(_serialize(post, fields))
+    yield '],"next":{}}}'.format(_dumps(page.next_cursor()))
+
+
+def _page(request, queryset, head=None):
+    try:
+        fields = _fields(request)
+        paginator = CursorPaginator(queryset, _limit(request))
+        page = paginator.page(request.GET.get('cursor'))
+    except BadRequest as error:
+        return _error(str(error))
+    except InvalidCursor:
+        return _error('Неверный курсор')
+    # Страница выбирается здесь, пока открыты соединение и выбранная
+    # реплика запроса: генератор только сериализует.
+    len(page)
+    return StreamingHttpResponse(
+        _stream(head or {}, page, fields), content_type='application/json'
+    )
+
+
+def login_required(view):
+    """Как django.contrib.auth.decorators.login_required, но вместо
+    редиректа на форму входа — 401."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _error('Нужно войти', status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+@conditional.feed
+def index(request):
+    return _page(request, feed.posts())
+
+
+@conditional.feed
+def group(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return _page(request, feed.posts(group.group_posts.all()), {
+        'group': {
+            'slug': group.slug,
+            'title': group.title,
+            'description': group.description,
+        },
+    })
+
+
+@login_required
+@conditional.follow_feed
+def follow(request):
+    return _page(request, feed.follow_feed(request.user))
+
+
+@conditional.profile
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    stats = counters.stats_for(author)
+    return _page(request, feed.posts(author.author_posts.all()), {
+        'author': {
+            'username': author.username,
+            'posts_count': stats.posts_count,
+            'followers_count': stats.followers_count,
+            'following_count': stats.following_count,
+        },
+    })
+
+
+@conditional.post
+def post(request, username, post_id):
+    try:
+        fields = _fields(request)
+    except BadRequest as error:
+        return _error(str(error))
+    post = get_object_or_404(
+        feed.posts(), author__username=username, id=post_id
+    )
+    return JsonResponse(_serialize(post, fields), json_dumps_params={
+        'ensure_ascii': False, 'separators': (',', ':'),
+    })
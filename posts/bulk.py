@@ -0,0 +1,207 @@
+"""Потоковые выгрузка и загрузка групп, постов, комментариев и подписок.
+
+Каждая модель — отдельный файл JSON Lines или CSV с одной строкой на
+запись. Первичные ключи сохраняются, поэтому ссылки между группами,
+постами и комментариями переносятся как есть; пользователи переносятся
+по username, ведь их id в разных окружениях разные.
+"""
+import csv
+import json
+import os
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+Spec = namedtuple('Spec', 'model fields users')
+
+# Порядок важен: модель ссылается только на те, что выше неё.
+MODELS = {
+    'group': Spec(Group, ('id', 'title', 'description', 'slug'), ()),
+    'post': Spec(
+        Post,
+        ('id', 'text', 'pub_date', 'updated', 'author', 'group', 'image'),
+        ('author',),
+    ),
+    'comment': Spec(
+        Comment, ('id', 'post', 'author', 'text', 'created', 'parent'),
+        ('author',),
+    ),
+    'follow': Spec(Follow, ('user', 'author'), ('user', 'author')),
+}
+FORMATS = ('jsonl', 'csv')
+
+
+class UnknownUsers(Exception):
+    pass
+
+
+class Progress:
+    """Печатает, сколько строк обработано и с какой скоростью."""
+
+    def __init__(self, write, label):
+        self.write = write
+        self.label = label
+        self.rows = 0
+        self.started = time.monotonic()
+
+    def add(self, rows):
+        self.rows += rows
+        self.write('{}: {} строк, {:.0f} строк/с'.format(
+            self.label, self.rows, self.rate()
+        ))
+
+    def rate(self):
+        return self.rows / max(time.monotonic() - self.started, 1e-9)
+
+
+def path_for(directory, name, fmt):
+    return os.path.join(directory, '{}.{}'.format(name, fmt))
+
+
+def _columns(spec):
+    """Колонки для values(): пользователи — по username, прочие FK — id."""
+    columns = []
+    for name in spec.fields:
+        if name in spec.users:
+            columns.append(name + '__username')
+        else:
+            columns.append(name)
+    return columns
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_model(name, directory, fmt, batch_size, write):
+    spec = MODELS[name]
+    columns = _columns(spec)
+    rows = spec.model.objects.order_by('pk').values_list(*columns)
+    progress = Progress(write, name)
+    done = 0
+    with open(path_for(directory, name, fmt), 'w', newline='',
+              encoding='utf-8') as out:
+        writer = None
+        if fmt == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(spec.fields)
+        for row in rows.iterator(chunk_size=batch_size):
+            row = [_serialize(value) for value in row]
+            if writer is not None:
+                writer.writerow(['' if value is None else value
+                                 for value in row])
+            else:
+                out.write(json.dumps(dict(zip(spec.fields, row)),
+                                     ensure_ascii=False))
+                out.write('\n')
+            done += 1
+            if done == batch_size:
+                progress.add(done)
+                done = 0
+    progress.add(done)
+    return progress
+
+
+def _read(path, fmt):
+    with open(path, newline='', encoding='utf-8') as source:
+        if fmt == 'csv':
+            for row in csv.DictReader(source):
+                yield {key: (value if value != '' else None)
+                       for key, value in row.items()}
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@contextmanager
+def explicit_dates(model):
+    """bulk_create не перезаписывает даты из файла на «сейчас»."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or
+        getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _build(spec, batch):
+    usernames = {row[name] for row in batch for name in spec.users}
+    users = dict(User.objects.filter(username__in=usernames).values_list(
+        'username', 'id'
+    ))
+    missing = usernames - set(users)
+    if missing:
+        raise UnknownUsers(', '.join(sorted(missing)[:10]))
+    opts = spec.model._meta
+    objects = []
+    for row in batch:
+        values = {}
+        for name in spec.fields:
+            field = opts.get_field(name)
+            value = row.get(name)
+            if name in spec.users:
+                values[field.attname] = users[value]
+            elif field.is_relation:
+                values[field.attname] = (
+                    None if value is None else int(value)
+                )
+            elif value is None and field.empty_strings_allowed:
+                # В CSV пустая строка и NULL неразличимы; для текстовых
+                # полей и файлов «пусто» — это ''.
+                values[field.attname] = ''
+            else:
+                values[field.attname] = field.to_python(value)
+        objects.append(spec.model(**values))
+    return objects
+
+
+def import_model(name, directory, fmt, batch_size, write,
+                 ignore_conflicts=False):
+    spec = MODELS[name]
+    progress = Progress(write, name)
+    rows = _read(path_for(directory, name, fmt), fmt)
+    with explicit_dates(spec.model):
+        for batch in batches(rows, batch_size):
+            with transaction.atomic():
+                spec.model.objects.bulk_create(
+                    _build(spec, batch),
+                    batch_size=batch_size,
+                    ignore_conflicts=ignore_conflicts,
+                )
+            progress.add(len(batch))
+    # Первичные ключи пришли из файла: сдвигаем последовательности
+    # (в PostgreSQL и Oracle; для SQLite список запросов пуст).
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+                no_style(), [spec.model]):
+            cursor.execute(sql)
+    return progress
@@ -0,0 +1,97 @@
+"""Проверки при старте: профиль production действительно включён.
+
+PRAGMA баз читаются отдельной проверкой с тегом database: Django
+запускает такие только по запросу (migrate, check --tag database и
+старт в yatube/wsgi.py), и остальные команды не открывают соединение
+ради проверки."""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from django.db import connections
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+PROFILES = ('development', 'production')
+
+
+def _sqlite_errors(connection):
+    if connection.is_in_memory_db():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout = cursor.fetchone()[0]
+    errors = []
+    if journal_mode.lower() != 'wal':
+        errors.append(Error(
+            'База {} не в режиме WAL (journal_mode={}).'.format(
+                connection.alias, journal_mode
+            ),
+            hint='Включите SQLITE_WAL.',
+            id='posts.E004',
+        ))
+    if not busy_timeout:
+        errors.append(Error(
+            'У базы {} нет busy_timeout.'.format(connection.alias),
+            hint="Задайте DATABASES['{}']['OPTIONS']['timeout'].".format(
+                connection.alias
+            ),
+            id='posts.E005',
+        ))
+    return errors
+
+
+@register()
+def production_profile(app_configs, **kwargs):
+    if settings.PROFILE not in PROFILES:
+        return [Error(
+            'Неизвестный профиль YATUBE_PROFILE={}.'.format(settings.PROFILE),
+            hint='Допустимы: {}.'.format(', '.join(PROFILES)),
+            id='posts.E000',
+        )]
+    if not settings.PRODUCTION:
+        return []
+    errors = []
+    if settings.DEBUG:
+        errors.append(Error('В production включён DEBUG.', id='posts.E001'))
+    if settings.SECRET_KEY == settings.DEVELOPMENT_SECRET_KEY:
+        errors.append(Error(
+            'В production SECRET_KEY взят из репозитория.',
+            hint='Задайте YATUBE_SECRET_KEY.',
+            id='posts.E006',
+        ))
+    for connection in connections.all():
+        if not connection.settings_dict['CONN_MAX_AGE']:
+            errors.append(Error(
+                'База {} открывает соединение на каждый запрос.'.format(
+                    connection.alias
+                ),
+                hint='Задайте CONN_MAX_AGE больше нуля.',
+                id='posts.E002',
+            ))
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates) and not any(
+            isinstance(loader, CachedLoader)
+            for loader in engine.engine.template_loaders
+        ):
+            errors.append(Error(
+                'Шаблоны {} читаются с диска на каждый рендер.'.format(
+                    engine.name
+                ),
+                hint='Оберните загрузчики в '
+                     'django.template.loaders.cached.Loader.',
+                id='posts.E003',
+            ))
+    return errors
+
+
+@register(Tags.database)
+def production_database(app_configs, **kwargs):
+    if not settings.PRODUCTION:
+        return []
+    errors = []
+    for connection in connections.all():
+        if connection.vendor == 'sqlite':
+            errors.extend(_sqlite_errors(connection))
+    return errors
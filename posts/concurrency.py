@@ -0,0 +1,71 @@
+"""Независимые запросы одной страницы выполняются параллельно.
+
+Async-видов в Django 2.2 нет, поэтому параллельность даёт пул потоков:
+каждая функция работает со своим соединением с БД, но читает из той же
+реплики и считается в замерах того же запроса. Включается
+CONCURRENT_LOOKUPS (в профиле production). В тестах выполнение
+последовательное: другой поток не видит данных из транзакции теста.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import instrumentation, routing
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.LOOKUP_WORKERS,
+                thread_name_prefix='lookup',
+            )
+    return _executor
+
+
+def _run(func, replica, recorder):
+    """(func(), была ли запись) в потоке пула."""
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(routing.reading_from(replica))
+            if recorder is not None:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(recorder.execute)
+                    )
+            result = func()
+    finally:
+        wrote = routing.take_wrote()
+        # Как после запроса: постоянные соединения остаются открытыми.
+        for connection in connections.all():
+            connection.close_if_unusable_or_obsolete()
+    return result, wrote
+
+
+def gather(*funcs):
+    """Результаты func() для всех funcs в том же порядке. Первая
+    выполняется в текущем потоке, остальные — в пуле. Запись в потоке
+    пула переносится в запрос: ReplicaMiddleware закрепит сессию за
+    основной базой."""
+    if not settings.CONCURRENT_LOOKUPS or len(funcs) < 2:
+        return [func() for func in funcs]
+    futures = [
+        _pool().submit(
+            _run, func, routing.current(), instrumentation.current()
+        )
+        for func in funcs[1:]
+    ]
+    results = [funcs[0]()]
+    for future in futures:
+        result, wrote = future.result()
+        if wrote:
+            routing.mark_wrote()
+        results.append(result)
+    return results
@@ -0,0 +1,77 @@
+"""Условные GET для лент, профиля и страницы поста.
+
+ETag считается из дешёвых меток: версий лент из fragments (это время
+последнего изменения), счётчиков автора и, для поста, времени правки и
+числа комментариев. Совпавший запрос получает 304 раньше, чем
+выполнится запрос ленты и отрисуется шаблон.
+
+ETag учитывает пользователя и полный путь со страницей или курсором.
+Last-Modified не отдаём: версии в наносекундах, а If-Modified-Since
+сравнивается с точностью до секунды, и правка в ту же секунду, что и
+прошлый ответ, вернула бы 304 с устаревшей страницей.
+"""
+import hashlib
+
+from django.views.decorators.http import condition
+
+from . import fragments
+from .models import Post, UserStats
+
+STATS_FIELDS = ('posts_count', 'followers_count', 'following_count')
+
+
+def _conditional(stamp):
+    """Декоратор из функции stamp(request, **kwargs) -> части ETag.
+
+    None — ресурса нет, 404 вернёт сам вид."""
+    def etag(request, *args, **kwargs):
+        parts = stamp(request, **kwargs)
+        if parts is None:
+            return None
+        raw = ':'.join(str(part) for part in (
+            request.user.id, request.get_full_path(), *parts
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    return condition(etag_func=etag)
+
+
+def _viewer_versions(request):
+    """Версии лент и подписок зрителя: от них зависит кнопка подписки."""
+    user = request.user if request.user.is_authenticated else None
+    return fragments.versions(user)
+
+
+def _author_stats(username):
+    return UserStats.objects.filter(user__username=username).values_list(
+        *STATS_FIELDS
+    ).first()
+
+
+@_conditional
+def feed(request, **kwargs):
+    return fragments.versions()
+
+
+@_conditional
+def follow_feed(request, **kwargs):
+    return fragments.versions(request.user)
+
+
+@_conditional
+def profile(request, username, **kwargs):
+    return [*_viewer_versions(request), _author_stats(username)]
+
+
+@_conditional
+def post(request, username, post_id, **kwargs):
+    # get(), а не first(): first() добавит ORDER BY, и SQLite станет
+    # сортировать единственную строку во временном B-дереве.
+    try:
+        found = Post.objects.values_list(
+            'updated', 'comments_count',
+            *('author__stats__' + name for name in STATS_FIELDS),
+        ).get(author__username=username, id=post_id)
+    except Post.DoesNotExist:
+        return None
+    return [*_viewer_versions(request), *found]
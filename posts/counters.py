@@ -0,0 +1,51 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Follow, Post, UserStats
+
+
+def _count(user_id):
+    return {
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+        'following_count': Follow.objects.filter(user_id=user_id).count(),
+    }
+
+
+def stats_for(user):
+    """Счётчики пользователя; если записи нет, она считается с нуля."""
+    try:
+        return UserStats.objects.get(user=user)
+    except UserStats.DoesNotExist:
+        pass
+    try:
+        with transaction.atomic():
+            return UserStats.objects.create(user=user, **_count(user.id))
+    except IntegrityError:
+        return UserStats.objects.get(user=user)
+
+
+def bump(user_id, **deltas):
+    """Атомарно сдвигает счётчики: UPDATE ... SET x = x + delta."""
+    UserStats.objects.filter(user_id=user_id).update(
+        **{name: F(name) + delta for name, delta in deltas.items()}
+        )
+
+
+def bump_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta,
+        updated=timezone.now(),
+        )
+
+
+def rebuild(user):
+    UserStats.objects.update_or_create(user=user, defaults=_count(user.id))
+
+
+def rebuild_comments():
+    comments = Comment.objects.filter(post=OuterRef('pk')).order_by(
+        ).values('post').annotate(total=Count('id')).values('total')
+    Post.objects.update(comments_count=Coalesce(Subquery(comments), 0))
@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.db.models import F, OuterRef, Q, Subquery
+
+from .models import FeedEntry, Follow, Post, UserStats
+
+CARD_FIELDS = (
+    'id', 'text', 'pub_date', 'updated', 'image', 'image_variants',
+    'comments_count',
+    'author__id', 'author__username',
+    'group__id', 'group__title', 'group__slug',
+)
+
+
+def posts(queryset=None):
+    """Посты для карточек ленты: автор и группа одним JOIN,
+    число комментариев из счётчика, только нужные карточке колонки."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.select_related('author', 'group').only(*CARD_FIELDS)
+
+
+def _overflow(followers):
+    """Подписчик сверх лимита: у такого автора ленты не рассылаются."""
+    limit = settings.FEED_FANOUT_LIMIT
+    return followers.values('id')[limit:limit + 1]
+
+
+def is_pulled(author_id):
+    """Посты автора читаются при запросе: подписчиков сверх лимита
+    сейчас или было, когда он публиковал (UserStats.feed_pulled)."""
+    return UserStats.objects.filter(
+        user_id=author_id, feed_pulled=True
+        ).exists() or _overflow(
+        Follow.objects.filter(author_id=author_id)
+        ).exists()
+
+
+def push_post(post):
+    limit = settings.FEED_FANOUT_LIMIT
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id
+        ).values_list('user_id', flat=True)[:limit + 1])
+    if len(followers) > limit:
+        # После отписок автор вернётся под лимит, а этот пост так и
+        # останется не разосланным: читаем автора при запросе и дальше.
+        UserStats.objects.filter(
+            user_id=post.author_id, feed_pulled=False
+            ).update(feed_pulled=True)
+        return
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers
+        ],
+        ignore_conflicts=True,
+        )
+
+
+def backfill(user_id, author_id):
+    if is_pulled(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+        ).values_list('id', 'pub_date')[:settings.FEED_BACKFILL_LIMIT]
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ],
+        ignore_conflicts=True,
+        )
+
+
+def trim(user_id, author_id):
+    FeedEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+        ).delete()
+
+
+def pulled_authors(user):
+    overflow = _overflow(Follow.objects.filter(author=OuterRef('author')))
+    return Follow.objects.filter(user=user).annotate(
+        overflow=Subquery(overflow)
+        ).filter(
+        Q(overflow__isnull=False) | Q(author__stats__feed_pulled=True)
+        ).values_list('author_id', flat=True)
+
+
+def follow_feed(user):
+    """Лента подписок: готовый список из FeedEntry плюс посты авторов,
+    которые читаются при запросе.
+
+    Готовый список упорядочен по дате и посту из самих записей, чтобы
+    страницы шли по индексу (user, -pub_date, -post) без сортировки."""
+    pulled = list(pulled_authors(user))
+    if not pulled:
+        return posts(Post.objects.filter(feed_entries__user=user)).annotate(
+            entry_date=F('feed_entries__pub_date'),
+            entry_post=F('feed_entries__post'),
+            ).order_by('-entry_date', '-entry_post')
+    inbox = FeedEntry.objects.filter(user=user).values('post_id')
+    return posts(Post.objects.filter(
+        Q(id__in=inbox) | Q(author_id__in=pulled)
+        ))
+
+
+def rebuild(user):
+    FeedEntry.objects.filter(user=user).delete()
+    for author_id in Follow.objects.filter(user=user).values_list(
+            'author_id', flat=True):
+        backfill(user.id, author_id)
+
+
+def reset_pulled():
+    """Перед пересборкой всех лент: при запросе остаются читаться только
+    авторы, у которых подписчиков сейчас сверх лимита, посты остальных
+    rebuild разложит по лентам."""
+    overflow = _overflow(Follow.objects.filter(author=OuterRef('user')))
+    over = UserStats.objects.annotate(
+        overflow=Subquery(overflow)
+        ).filter(overflow__isnull=False).values('user')
+    UserStats.objects.exclude(user__in=over).update(feed_pulled=False)
+    UserStats.objects.filter(user__in=over).update(feed_pulled=True)
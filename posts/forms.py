@@ -1,3 +1,6 @@
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 
 from .models import Comment, Post
@@ -8,6 +11,37 @@ class PostForm(ModelForm):
         model = Post
         fields = ('group', 'text', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Файл сверх лимита BoundedUploadHandler не дописал на диск:
+        # ImageField незачем его открывать, ошибку выдаст clean_image.
+        upload = self.files.get('image')
+        self.oversized = getattr(upload, 'oversized', False)
+        if self.oversized:
+            self.files = self.files.copy()
+            del self.files['image']
+
+    def clean_image(self):
+        """Размер файла и число пикселей по заголовку: ImageField
+        открывает картинку только ради verify(), пиксели не декодируются."""
+        image = self.cleaned_data['image']
+        if not self.oversized and not isinstance(image, UploadedFile):
+            return image
+        if self.oversized or image.size > settings.POST_IMAGE_MAX_BYTES:
+            raise forms.ValidationError(
+                'Файл больше %(limit)s МБ.',
+                code='too_large',
+                params={'limit': settings.POST_IMAGE_MAX_BYTES // 2 ** 20},
+            )
+        if image.image.width * image.image.height > \
+                settings.POST_IMAGE_MAX_PIXELS:
+            raise forms.ValidationError(
+                'Картинка больше %(limit)s мегапикселей.',
+                code='too_many_pixels',
+                params={'limit': settings.POST_IMAGE_MAX_PIXELS // 10 ** 6},
+            )
+        return image
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+POSTS_VERSION_KEY = 'feed_version:posts'
+FOLLOW_VERSION_KEY = 'feed_version:follow:{}'
+
+
+def _version(key):
+    # Версия — время последнего изменения в наносекундах: после
+    # вытеснения ключа она не повторится, так что не оживут ни старые
+    # фрагменты, ни старые ETag из conditional.
+    return cache.get_or_set(key, time.time_ns(), None)
+
+
+def _bump(key):
+    cache.set(key, time.time_ns(), None)
+
+
+def bump_posts():
+    """Меняет версию всех лент: пост создан, изменён или прокомментирован."""
+    _bump(POSTS_VERSION_KEY)
+
+
+def bump_follow(user_id):
+    """Меняет версию ленты подписок одного пользователя."""
+    _bump(FOLLOW_VERSION_KEY.format(user_id))
+
+
+def versions(user=None):
+    """Версия всех лент и, если передан user, версия его подписок."""
+    result = [_version(POSTS_VERSION_KEY)]
+    if user is not None:
+        result.append(_version(FOLLOW_VERSION_KEY.format(user.id)))
+    return result
+
+
+def feed_cache(user=None):
+    """Контекст для {% cache %}: срок жизни и версия ленты.
+
+    Для ленты подписок передаётся её владелец, версия учитывает и его
+    подписки."""
+    return {
+        'feed_ttl': settings.FEED_CACHE_TTL,
+        'feed_version': '.'.join(str(version) for version in versions(user)),
+    }
@@ -0,0 +1,247 @@
+"""Полнотекстовый поиск по постам и комментариям к ним.
+
+Документ поста — его текст и тексты комментариев, разобранные на основы
+слов (posts.stemming). Индекс обновляется сигналами при каждом
+изменении: слова нового комментария дописываются к документу поста,
+удалённого — вычитаются. Сам индекс хранит бэкенд из
+settings.SEARCH_BACKEND.
+"""
+import base64
+import binascii
+import json
+import math
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (
+    Case, Count, ExpressionWrapper, F, FloatField, Q, Sum, When,
+)
+from django.utils.module_loading import import_string
+
+from . import feed
+from .models import Comment, Post, SearchTerm
+from .paginator import CursorPage, InvalidCursor
+from .stemming import terms
+
+
+class FTS5Backend:
+    """Виртуальная таблица SQLite FTS5, rowid = id поста. Ранжирует bm25."""
+
+    table = 'posts_search'
+
+    def index(self, post_id, words):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post_id]
+            )
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, body) VALUES (%s, %s)',
+                [post_id, ' '.join(words)],
+            )
+
+    def add(self, post_id, words):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.table} SET body = body || ' ' || %s "
+                f'WHERE rowid = %s',
+                [' '.join(words), post_id],
+            )
+
+    def subtract(self, post_id, words):
+        """Убирает из документа по одному вхождению каждого слова."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT body FROM {self.table} WHERE rowid = %s', [post_id]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return
+        drop = Counter(words)
+        kept = []
+        for word in row[0].split():
+            if drop[word] > 0:
+                drop[word] -= 1
+            else:
+                kept.append(word)
+        self.index(post_id, kept)
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post_id]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, words, after, limit):
+        match = ' '.join('"{}"'.format(word) for word in words)
+        sql = (
+            f'SELECT post_id, score FROM (SELECT rowid AS post_id, '
+            f'rank AS score FROM {self.table} WHERE {self.table} MATCH %s)'
+        )
+        params = [match]
+        if after is not None:
+            sql += ' WHERE score > %s OR (score = %s AND post_id > %s)'
+            params += [after[0], after[0], after[1]]
+        sql += ' ORDER BY score, post_id LIMIT %s'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return cursor.fetchall()
+
+
+class TableBackend:
+    """Обратный индекс в обычной таблице SearchTerm: работает на любой
+    базе. Ранжирует по tf-idf, меньший score — выше в выдаче."""
+
+    def _counts(self, words):
+        return Counter(word[:SearchTerm.TERM_LENGTH] for word in words)
+
+    def _by_count(self, counts):
+        """Основы, сгруппированные по числу вхождений: одна группа —
+        один UPDATE."""
+        groups = {}
+        for term, count in counts.items():
+            groups.setdefault(count, []).append(term)
+        return groups.items()
+
+    def index(self, post_id, words):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+        SearchTerm.objects.bulk_create([
+            SearchTerm(term=term, post_id=post_id, count=count)
+            for term, count in self._counts(words).items()
+        ])
+
+    def add(self, post_id, words):
+        counts = self._counts(words)
+        known = set(SearchTerm.objects.filter(
+            post_id=post_id, term__in=counts
+        ).values_list('term', flat=True))
+        for count, group in self._by_count(
+                {term: counts[term] for term in known}):
+            SearchTerm.objects.filter(
+                post_id=post_id, term__in=group
+            ).update(count=F('count') + count)
+        SearchTerm.objects.bulk_create([
+            SearchTerm(term=term, post_id=post_id, count=count)
+            for term, count in counts.items() if term not in known
+        ])
+
+    def subtract(self, post_id, words):
+        for count, group in self._by_count(self._counts(words)):
+            terms = SearchTerm.objects.filter(post_id=post_id, term__in=group)
+            terms.filter(count__lte=count).delete()
+            terms.update(count=F('count') - count)
+
+    def remove(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+    def clear(self):
+        SearchTerm.objects.all().delete()
+
+    def search(self, words, after, limit):
+        words = sorted({word[:SearchTerm.TERM_LENGTH] for word in words})
+        frequency = dict(
+            SearchTerm.objects.filter(term__in=words).values_list(
+                'term'
+            ).annotate(Count('id')).order_by()
+        )
+        if len(frequency) < len(words):
+            return []
+        total = Post.objects.count()
+        score = Sum(Case(
+            *[
+                When(term=word, then=ExpressionWrapper(
+                    F('count') * -math.log(1 + total / frequency[word]),
+                    output_field=FloatField(),
+                ))
+                for word in words
+            ],
+            output_field=FloatField(),
+        ))
+        hits = SearchTerm.objects.filter(term__in=words).values(
+            'post_id'
+        ).annotate(matched=Count('id'), score=score).filter(
+            matched=len(words)
+        )
+        if after is not None:
+            hits = hits.filter(
+                Q(score__gt=after[0]) | Q(score=after[0], post_id__gt=after[1])
+            )
+        return list(hits.order_by('score', 'post_id').values_list(
+            'post_id', 'score'
+        )[:limit])
+
+
+@lru_cache(maxsize=None)
+def backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def add_comment(post_id, text):
+    """Дописывает в документ поста слова нового комментария, не
+    перечитывая остальные комментарии."""
+    backend().add(post_id, terms(text))
+
+
+def remove_comment(post_id, text):
+    backend().subtract(post_id, terms(text))
+
+
+def reindex(post_id):
+    post = Post.objects.filter(pk=post_id).values_list('text', flat=True)
+    text = post.first()
+    if text is None:
+        backend().remove(post_id)
+        return
+    comments = Comment.objects.filter(post_id=post_id).values_list(
+        'text', flat=True
+    )
+    backend().index(post_id, terms(' '.join([text, *comments])))
+
+
+class SearchPaginator:
+    """Курсорные страницы выдачи: курсор — (score, id) последнего поста."""
+
+    def __init__(self, query, per_page):
+        self.words = terms(query)
+        self.per_page = int(per_page)
+
+    def encode_cursor(self, post, previous=False):
+        raw = json.dumps([post.search_score, post.id])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            score, post_id = json.loads(raw.decode())
+            return float(score), int(post_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+
+    def page(self, cursor=None):
+        after = self.decode_cursor(cursor) if cursor else None
+
+        def load():
+            hits = []
+            if self.words:
+                hits = backend().search(self.words, after, self.per_page + 1)
+            has_next = len(hits) > self.per_page
+            hits = hits[:self.per_page]
+            posts = feed.posts().in_bulk([post_id for post_id, _ in hits])
+            items = []
+            for post_id, score in hits:
+                if post_id in posts:
+                    posts[post_id].search_score = score
+                    items.append(posts[post_id])
+            return items, has_next, False
+        return CursorPage(load, self)
+
+    def get_page(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
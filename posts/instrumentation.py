@@ -0,0 +1,319 @@
+"""Замеры каждого запроса: время, запросы к БД, кэш и рендер шаблонов.
+
+InstrumentationMiddleware собирает их в Recorder текущего потока. В
+режиме INSTRUMENTATION_HEADERS цифры уходят в заголовки ответа, а
+гистограммы по имени URL копятся в памяти процесса и отдаются
+администратору через report().
+
+Запросы к БД дольше SLOW_QUERY_MS и запросы одной формы, повторённые
+за один HTTP-запрос, пишутся в журнал posts.queries вместе с местом
+вызова: строкой кода, строкой вида, шаблоном и тегом. Разбирает
+журнал команда query_report.
+"""
+import inspect
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.db import connections
+from django.http import JsonResponse
+from django.template.base import Template
+
+logger = logging.getLogger('posts.queries')
+
+WALL_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+_local = threading.local()
+_lock = threading.Lock()
+_histograms = {}
+
+
+def current():
+    """Recorder запроса, который сейчас обрабатывает этот поток."""
+    return getattr(_local, 'recorder', None)
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST_RE = re.compile(
+    r'\bIN\s*\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)', re.IGNORECASE
+)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Форма запроса: литералы заменены на ?, списки IN (...) свёрнуты."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _LIST_RE.sub('IN (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def _project_file(filename):
+    return (filename.startswith(settings.BASE_DIR) and
+            filename != __file__ and 'site-packages' not in filename)
+
+
+def _where(frame):
+    return '{}:{} in {}'.format(
+        os.path.relpath(frame.f_code.co_filename, settings.BASE_DIR),
+        frame.f_lineno, frame.f_code.co_name,
+    )
+
+
+def origin(view_code=None):
+    """Откуда выполняется запрос: ближайшая строка кода проекта,
+    строка в самом виде (его код — view_code) и ближайший узел
+    шаблона, который сейчас рендерится."""
+    code = view = template = tag = None
+    frame = sys._getframe(1)
+    while frame is not None and (
+            code is None or template is None or
+            view is None and view_code is not None):
+        if code is None and _project_file(frame.f_code.co_filename):
+            code = _where(frame)
+        if view is None and frame.f_code is view_code:
+            view = _where(frame)
+        if template is None and frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            if token is not None:
+                template = '{}:{}'.format(
+                    node.origin.template_name or node.origin.name,
+                    token.lineno,
+                )
+                tag = token.contents[:80]
+        frame = frame.f_back
+    return {'code': code, 'view': view, 'template': template, 'tag': tag}
+
+
+class QueryLogHandler(RotatingFileHandler):
+    """RotatingFileHandler, который открывает журнал при первой записи
+    и тогда же создаёт его каталог: импорт настроек ничего не пишет
+    на диск."""
+    def __init__(self, filename, **kwargs):
+        kwargs.setdefault('delay', True)
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class Recorder:
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.shapes = Counter()
+        self.duplicates = {}
+        # execute зовут и потоки posts.concurrency того же запроса.
+        self._lock = threading.Lock()
+
+    @property
+    def view(self):
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else '<unresolved>'
+
+    @property
+    def view_code(self):
+        """Код функции вида без декораторов: по нему origin() находит
+        строку вида, даже если запрос выполняется из пагинатора или
+        шаблона."""
+        match = getattr(self.request, 'resolver_match', None)
+        if match is None:
+            return None
+        return getattr(inspect.unwrap(match.func), '__code__', None)
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            shape = normalize(sql)
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+                self.shapes[shape] += 1
+                repeated = self.shapes[shape] == 2
+            # Место вызова ищется только для подозрительных запросов:
+            # обход стека заметно дороже самого подсчёта.
+            if repeated:
+                self.duplicates[shape] = origin(self.view_code)
+            if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+                self.log('slow', shape, ms=round(elapsed * 1000, 1),
+                         origin=origin(self.view_code))
+
+    def log(self, kind, sql, **fields):
+        logger.warning('%s', json.dumps(
+            {'kind': kind, 'view': self.view, 'sql': sql, **fields},
+            ensure_ascii=False,
+        ))
+
+    def finish(self):
+        """Пишет в журнал формы, повторившиеся за запрос."""
+        for shape, where in self.duplicates.items():
+            count = self.shapes[shape]
+            if count >= settings.DUPLICATE_QUERY_THRESHOLD:
+                self.log('duplicate', shape, count=count, origin=where)
+
+
+def _instrumented_render(render):
+    def wrapper(self, context):
+        recorder = current()
+        if recorder is None:
+            return render(self, context)
+        # Вложенные {% include %} тоже вызывают render: считаем только
+        # внешний шаблон, иначе время посчитается дважды.
+        recorder.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            recorder.template_depth -= 1
+            if not recorder.template_depth:
+                recorder.template_time += time.perf_counter() - started
+    wrapper.instrumented = True
+    return wrapper
+
+
+def _instrument_templates():
+    if not getattr(Template.render, 'instrumented', False):
+        Template.render = _instrumented_render(Template.render)
+
+
+def _instrument_cache(stack, recorder):
+    """Считает попадания get/get_many кэша этого потока до конца запроса.
+
+    caches[alias] свой у каждого потока, так что подмена методов на
+    экземпляре не задевает соседние запросы."""
+    for alias in settings.CACHES:
+        backend = caches[alias]
+        get, get_many = backend.get, backend.get_many
+        missing = object()
+
+        def counted_get(key, default=None, version=None, get=get):
+            value = get(key, missing, version=version)
+            if value is missing:
+                recorder.cache_misses += 1
+                return default
+            recorder.cache_hits += 1
+            return value
+
+        def counted_get_many(keys, version=None, get_many=get_many):
+            keys = list(keys)
+            found = get_many(keys, version=version)
+            recorder.cache_hits += len(found)
+            recorder.cache_misses += len(keys) - len(found)
+            return found
+
+        backend.get, backend.get_many = counted_get, counted_get_many
+        stack.callback(_restore, backend)
+
+
+def _restore(backend):
+    del backend.get, backend.get_many
+
+
+def _record(name, wall_ms, recorder):
+    with _lock:
+        entry = _histograms.setdefault(name, {
+            'count': 0,
+            'wall_ms': [0] * (len(WALL_BUCKETS_MS) + 1),
+            'queries': [0] * (len(QUERY_BUCKETS) + 1),
+            'db_ms': 0.0,
+            'template_ms': 0.0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+        })
+        entry['count'] += 1
+        entry['wall_ms'][bisect_left(WALL_BUCKETS_MS, wall_ms)] += 1
+        entry['queries'][bisect_left(QUERY_BUCKETS, recorder.queries)] += 1
+        entry['db_ms'] += recorder.db_time * 1000
+        entry['template_ms'] += recorder.template_time * 1000
+        entry['cache_hits'] += recorder.cache_hits
+        entry['cache_misses'] += recorder.cache_misses
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _instrument_templates()
+
+    def __call__(self, request):
+        recorder = Recorder(request)
+        _local.recorder = recorder
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(recorder.execute)
+                    )
+                _instrument_cache(stack, recorder)
+                response = self.get_response(request)
+        finally:
+            _local.recorder = None
+        wall_ms = (time.perf_counter() - started) * 1000
+        recorder.finish()
+        name = recorder.view
+        _record(name, wall_ms, recorder)
+        if settings.INSTRUMENTATION_HEADERS:
+            self.add_headers(response, name, wall_ms, recorder)
+        return response
+
+    def add_headers(self, response, name, wall_ms, recorder):
+        db_ms = recorder.db_time * 1000
+        template_ms = recorder.template_time * 1000
+        response['X-View'] = name
+        response['X-Request-Time'] = '{:.1f}'.format(wall_ms)
+        response['X-DB-Queries'] = str(recorder.queries)
+        response['X-DB-Time'] = '{:.1f}'.format(db_ms)
+        response['X-Cache-Hits'] = str(recorder.cache_hits)
+        response['X-Cache-Misses'] = str(recorder.cache_misses)
+        response['X-Template-Time'] = '{:.1f}'.format(template_ms)
+        response['Server-Timing'] = (
+            'db;dur={:.1f}, tpl;dur={:.1f}, total;dur={:.1f}'.format(
+                db_ms, template_ms, wall_ms
+            )
+        )
+
+
+def _labels(buckets, unit=''):
+    return ['<={}{}'.format(bound, unit) for bound in buckets] + [
+        '>{}{}'.format(buckets[-1], unit)
+    ]
+
+
+@staff_member_required
+def report(request):
+    """Гистограммы по имени URL, накопленные этим процессом."""
+    with _lock:
+        views = {
+            name: {
+                **entry,
+                'wall_ms': dict(zip(_labels(WALL_BUCKETS_MS, 'ms'),
+                                    entry['wall_ms'])),
+                'queries': dict(zip(_labels(QUERY_BUCKETS),
+                                    entry['queries'])),
+            }
+            for name, entry in sorted(_histograms.items())
+        }
+    return JsonResponse({'pid': os.getpid(), 'views': views})
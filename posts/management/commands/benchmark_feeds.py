@@ -0,0 +1,146 @@
+import json
+import statistics
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import urls
+from posts.models import Group, Post, Tag
+
+User = get_user_model()
+
+# Кроме страниц с репликами, только чтение: поиск, теги и упоминания.
+# Подписка, отписка, новый пост и комментарий по GET ничего не меряют,
+# а меняют данные, на которых считаются остальные страницы.
+READ_VIEWS = set(settings.REPLICA_VIEWS) | {'search', 'tag', 'mentions'}
+
+
+class Command(BaseCommand):
+    help = ('Гоняет URL для чтения из posts/urls.py через тестовый клиент и '
+            'меряет p50/p95 времени ответа, число запросов и пик памяти')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Чистить кэш перед каждым запросом'
+        )
+        parser.add_argument('--output', help='Куда сохранить результат JSON')
+        parser.add_argument('--baseline', help='JSON прошлого прогона')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 и числа запросов относительно baseline'
+        )
+
+    def targets(self):
+        """Аргументы URL: самый популярный автор, его пост, самая большая
+        группа и самый частый тег; читает тот, у кого больше подписок."""
+        author = User.objects.annotate(
+            total=Count('following')
+        ).order_by('-total', 'id').first()
+        reader = User.objects.annotate(
+            total=Count('follower')
+        ).order_by('-total', 'id').first()
+        post = Post.objects.filter(author=author).order_by('-id').first()
+        group = Group.objects.annotate(
+            total=Count('group_posts')
+        ).order_by('-total', 'id').first()
+        tag = Tag.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total', 'id').first()
+        if None in (author, reader, post, group, tag):
+            raise CommandError(
+                'Мало данных: сначала запустите generate_data'
+            )
+        return reader, list(self.build_urls({
+            'username': author.username,
+            'post_id': post.id,
+            'slug': group.slug,
+            'name': tag.name,
+        }, tag.name))
+
+    def build_urls(self, values, query):
+        for pattern in urls.urlpatterns:
+            if pattern.name not in READ_VIEWS:
+                continue
+            names = pattern.pattern.converters
+            kwargs = {name: values[name] for name in names}
+            url = reverse(pattern.name, kwargs=kwargs)
+            if pattern.name == 'search':
+                url += '?' + urlencode({'q': query})
+            yield pattern.name, url
+
+    def measure(self, client, url, runs, cold):
+        timings = []
+        for _ in range(runs):
+            if cold:
+                cache.clear()
+            started = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        if cold:
+            cache.clear()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        timings.sort()
+        return {
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(
+                timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2
+            ),
+            'queries': len(queries),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def handle(self, *args, **options):
+        results = {}
+        reader, targets = self.targets()
+        client = Client()
+        client.force_login(reader)
+        for name, url in targets:
+            results[name] = self.measure(
+                client, url, max(options['requests'], 1), options['cold']
+            )
+            self.stdout.write('{:<18} p50 {p50_ms:>8} мс  p95 {p95_ms:>8} мс'
+                              '  запросов {queries:>3}  память {peak_kb} КБ'
+                              .format(name, **results[name]))
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                json.dump(results, out, indent=2, sort_keys=True)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        with open(path) as source:
+            baseline = json.load(source)
+        regressions = []
+        for name, current in sorted(results.items()):
+            before = baseline.get(name)
+            if before is None:
+                continue
+            for metric in ('p95_ms', 'queries'):
+                if current[metric] > before[metric] * (1 + tolerance) and \
+                        current[metric] - before[metric] >= 1:
+                    regressions.append('{} {}: {} -> {}'.format(
+                        name, metric, before[metric], current[metric]
+                    ))
+        if regressions:
+            raise CommandError(
+                'Хуже baseline:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Не хуже baseline'))
@@ -0,0 +1,114 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+
+from posts import threads
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает чтение глубоких и широких веток ответов по '
+            'материализованному пути с рекурсивным обходом по parent_id. '
+            'Все данные создаются в транзакции и откатываются')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--width', type=int, default=1000,
+            help='Ответов на один корень в широкой ветке'
+        )
+        parser.add_argument(
+            '--depth', type=int, default=20,
+            help='Длина цепочки ответов в глубокой ветке'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=50,
+            help='Сколько глубоких веток у поста'
+        )
+        parser.add_argument('--preview', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create(username='benchmark_threads')
+            post = Post.objects.create(text='Ветки', author=user)
+            self.next_id = (Comment.objects.aggregate(
+                last=Max('id')
+            )['last'] or 0) + 1
+            wide = self.build(post, user, [options['width']])
+            self.report('широкая', [wide], options['preview'])
+            deep = [
+                self.build(post, user, [1] * options['depth'])
+                for _ in range(options['threads'])
+            ]
+            self.report('глубокая', deep, options['preview'])
+            transaction.set_rollback(True)
+
+    def build(self, post, user, fanout):
+        """Ветка, где у каждого комментария уровня i fanout[i] ответов."""
+        root = self.comment(post, user, None)
+        comments = [root]
+        level = [root]
+        for width in fanout:
+            level = [
+                self.comment(post, user, parent)
+                for parent in level for _ in range(width)
+            ]
+            comments.extend(level)
+        for position, comment in enumerate(comments):
+            comment.position = position
+        Comment.objects.bulk_create(comments)
+        return root
+
+    def comment(self, post, user, parent):
+        comment_id = self.next_id
+        self.next_id += 1
+        if parent is None:
+            thread_id, path, depth = comment_id, '', 0
+        else:
+            thread_id, path = parent.thread_id, parent.path
+            depth = parent.depth + 1
+        return Comment(
+            id=comment_id, post=post, author=user, text='Ответ',
+            parent=parent, thread_id=thread_id,
+            path=path + threads.segment(comment_id), depth=depth,
+        )
+
+    def recursive(self, comment_id):
+        """Так читались бы ветки без пути: запрос на каждый узел."""
+        replies = list(Comment.objects.filter(parent_id=comment_id))
+        for reply in list(replies):
+            replies.extend(self.recursive(reply.id))
+        return replies
+
+    def measure(self, read):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            rows = read()
+            elapsed = (time.perf_counter() - started) * 1000
+        return len(rows), len(queries), elapsed
+
+    def report(self, name, roots, preview):
+        roots = list(Comment.objects.filter(pk__in=[r.id for r in roots]))
+        results = {
+            'превью': self.measure(lambda: [
+                reply for root in threads.attach(roots, preview)
+                for reply in root.thread_replies
+            ]),
+            'путь': self.measure(lambda: list(Comment.objects.filter(
+                thread_id__in=[root.id for root in roots], position__gte=1,
+            ).order_by('path'))),
+            'parent_id': self.measure(lambda: [
+                reply for root in roots
+                for reply in self.recursive(root.id)
+            ]),
+        }
+        for method, (rows, queries, elapsed) in results.items():
+            self.stdout.write(
+                '{:<9} {:<9} строк {:>6}  запросов {:>6}  {:>9.1f} мс'
+                .format(name, method, rows, queries, elapsed)
+            )
@@ -0,0 +1,50 @@
+import multiprocessing
+import random
+import uuid
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker(args):
+    prefix, keys, requests, seed = args
+    rnd = random.Random(seed)
+    hits = 0
+    for _ in range(requests):
+        key = '{}:{}'.format(prefix, rnd.randrange(keys))
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, 'x' * 512)
+    return hits
+
+
+class Command(BaseCommand):
+    help = ('Меряет долю попаданий в кэш, когда одни и те же ключи '
+            'читают несколько процессов-воркеров')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--keys', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        prefix = 'cache_hit_rate:{}'.format(uuid.uuid4().hex)
+        jobs = [
+            (prefix, options['keys'], options['requests'], seed)
+            for seed in range(workers)
+        ]
+        connections.close_all()
+        cache.close()
+        with multiprocessing.Pool(workers) as pool:
+            hits = pool.map(_worker, jobs)
+        total = workers * options['requests']
+        # Один процесс с теми же запросами промахнулся бы только keys раз.
+        ideal = 1 - min(options['keys'], total) / total
+        self.stdout.write('Бэкенд: {}'.format(type(cache).__name__))
+        self.stdout.write('Воркеров: {}, запросов: {}'.format(workers, total))
+        self.stdout.write('Попаданий: {:.1%} (общий кэш дал бы {:.1%})'.format(
+            sum(hits) / total, ideal
+            ))
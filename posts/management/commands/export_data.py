@@ -0,0 +1,31 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = ('Выгружает группы, посты, комментарии и подписки в каталог: '
+            'по файлу JSON Lines или CSV на модель')
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--format', choices=bulk.FORMATS, default='jsonl')
+        parser.add_argument(
+            '--models', nargs='+', choices=list(bulk.MODELS),
+            default=list(bulk.MODELS),
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        os.makedirs(options['directory'], exist_ok=True)
+        for name in bulk.MODELS:
+            if name in options['models']:
+                progress = bulk.export_model(
+                    name, options['directory'], options['format'],
+                    options['batch_size'], self.stdout.write,
+                )
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}: выгружено {progress.rows} строк'
+                ))
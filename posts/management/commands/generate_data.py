@@ -0,0 +1,132 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from posts import bulk
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+WORDS = (
+    'кошка собака утро вечер город река лес дорога книга музыка друг '
+    'работа отпуск море горы дождь солнце кофе чай поезд'
+).split()
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, постами, '
+            'комментариями и подписками со степенным распределением '
+            'популярности авторов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель закона Ципфа: чем больше, тем сильнее '
+                 'подписчики и посты достаются немногим авторам'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--skip-derived', action='store_true')
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = 'bench{}_'.format(options['seed'])
+
+        self.insert(User, (
+            User(username=f'{prefix}{i}', password=make_password(None))
+            for i in range(options['users'])
+        ))
+        users = list(User.objects.filter(
+            username__startswith=prefix
+        ).order_by('id').values_list('id', flat=True))
+        # Авторы в случайном порядке, вес автора с рангом r — 1 / r^alpha.
+        authors = users[:]
+        self.rnd.shuffle(authors)
+        weights = list(accumulate(
+            1 / rank ** options['alpha'] for rank in range(1, len(users) + 1)
+        ))
+
+        def popular():
+            return self.rnd.choices(authors, cum_weights=weights)[0]
+
+        self.insert(Group, (
+            Group(title=f'Группа {i}', description='Описание',
+                  slug=f'{prefix}{i}')
+            for i in range(options['groups'])
+        ))
+        groups = list(Group.objects.filter(
+            slug__startswith=prefix
+        ).values_list('id', flat=True))
+
+        now = timezone.now()
+        with bulk.explicit_dates(Post):
+            self.insert(Post, (
+                Post(
+                    text=self.text(),
+                    author_id=popular(),
+                    group_id=self.rnd.choice(groups + [None]),
+                    pub_date=now - timedelta(seconds=self.rnd.randrange(
+                        365 * 24 * 3600
+                    )),
+                    updated=now,
+                )
+                for _ in range(options['posts'])
+            ))
+        bounds = Post.objects.filter(
+            author__username__startswith=prefix
+        ).aggregate(first=Min('id'), last=Max('id'))
+
+        self.insert(Comment, (
+            Comment(
+                text=self.text(),
+                post_id=self.rnd.randint(bounds['first'], bounds['last']),
+                author_id=self.rnd.choice(users),
+            )
+            for _ in range(options['comments'] if bounds['first'] else 0)
+        ))
+
+        edges = set()
+        attempts = 0
+        while len(edges) < options['follows'] and \
+                attempts < options['follows'] * 10:
+            attempts += 1
+            user, author = self.rnd.choice(users), popular()
+            if user != author:
+                edges.add((user, author))
+        self.insert(Follow, (
+            Follow(user_id=user, author_id=author) for user, author in edges
+        ))
+
+        if not options['skip_derived']:
+            for command in ('rebuild_counters', 'rebuild_feeds',
+                            'rebuild_search', 'rebuild_tags',
+                            'rebuild_threads'):
+                call_command(command, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Синтетические данные готовы'))
+
+    def text(self):
+        words = self.rnd.choices(WORDS, k=self.rnd.randint(5, 40))
+        if self.rnd.random() < 0.2:
+            words.append('#' + self.rnd.choice(WORDS))
+        return ' '.join(words)
+
+    def insert(self, model, objects):
+        progress = bulk.Progress(self.stdout.write, model._meta.model_name)
+        for batch in bulk.batches(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            progress.add(len(batch))
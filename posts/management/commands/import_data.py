@@ -0,0 +1,52 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = ('Загружает группы, посты, комментарии и подписки из каталога '
+            'export_data пачками bulk_create')
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--format', choices=bulk.FORMATS, default='jsonl')
+        parser.add_argument(
+            '--models', nargs='+', choices=list(bulk.MODELS),
+            default=list(bulk.MODELS),
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, которые уже есть в базе'
+        )
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Не пересобирать счётчики, ленты, поиск и теги после загрузки'
+        )
+
+    def handle(self, *args, **options):
+        for name in bulk.MODELS:
+            if name not in options['models']:
+                continue
+            try:
+                progress = bulk.import_model(
+                    name, options['directory'], options['format'],
+                    options['batch_size'], self.stdout.write,
+                    ignore_conflicts=options['ignore_conflicts'],
+                )
+            except bulk.UnknownUsers as error:
+                raise CommandError(
+                    f'{name}: нет таких пользователей: {error}'
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: загружено {progress.rows} строк, '
+                f'{progress.rate():.0f} строк/с'
+            ))
+        if options['skip_derived']:
+            return
+        # bulk_create не шлёт сигналов: производные данные считаем заново.
+        for command in ('rebuild_counters', 'rebuild_feeds',
+                        'rebuild_search', 'rebuild_tags',
+                        'rebuild_threads'):
+            call_command(command, stdout=self.stdout)
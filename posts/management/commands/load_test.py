@@ -0,0 +1,91 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from .benchmark_feeds import Command as FeedBenchmark
+
+# Виды для чтения, которым не нужен вход.
+LOGIN_VIEWS = {'follow_index', 'api_follow'}
+
+
+class Command(BaseCommand):
+    help = ('Нагружает запущенные серверы (например, gunicorn с '
+            'yatube.wsgi и uvicorn с yatube.asgi) страницами только для '
+            'чтения и сравнивает пропускную способность и задержки '
+            'при разной конкурентности')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'servers', nargs='+', help='Например, http://127.0.0.1:8000'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 10, 50]
+        )
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Запросов на каждый уровень конкурентности'
+        )
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--output', help='Куда сохранить результат JSON')
+
+    def paths(self):
+        _, targets = FeedBenchmark().targets()
+        return [
+            url for name, url in targets
+            if name in settings.REPLICA_VIEWS and name not in LOGIN_VIEWS
+        ]
+
+    def fetch(self, url, timeout):
+        started = time.perf_counter()
+        try:
+            with urlopen(url, timeout=timeout) as response:
+                response.read()
+            ok = True
+        except (URLError, OSError):
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    def run(self, server, paths, concurrency, requests, timeout):
+        urls = [server.rstrip('/') + path
+                for path in islice(cycle(paths), requests)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda url: self.fetch(url, timeout),
+                                    urls))
+        elapsed = time.perf_counter() - started
+        timings = sorted(ms for ms, _ in results)
+        return {
+            'rps': round(len(results) / elapsed, 1),
+            'p50_ms': round(statistics.median(timings), 1),
+            'p95_ms': round(
+                timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1
+            ),
+            'errors': sum(not ok for _, ok in results),
+        }
+
+    def handle(self, *args, **options):
+        paths = self.paths()
+        results = {}
+        for server in options['servers']:
+            results[server] = {}
+            for concurrency in options['concurrency']:
+                result = self.run(
+                    server, paths, max(concurrency, 1),
+                    max(options['requests'], 1), options['timeout'],
+                )
+                results[server][concurrency] = result
+                self.stdout.write(
+                    '{:<28} c={:<4} {rps:>8} запр/с  p50 {p50_ms:>8} мс  '
+                    'p95 {p95_ms:>8} мс  ошибок {errors}'
+                    .format(server, concurrency, **result)
+                )
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                json.dump(results, out, indent=2, sort_keys=True)
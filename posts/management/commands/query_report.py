@@ -0,0 +1,95 @@
+import json
+import os
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def _files(path):
+    """Журнал и его ротированные копии, от старых к новым."""
+    rotated = []
+    index = 1
+    while os.path.exists('{}.{}'.format(path, index)):
+        rotated.append('{}.{}'.format(path, index))
+        index += 1
+    return rotated[::-1] + ([path] if os.path.exists(path) else [])
+
+
+def _records(path):
+    for name in _files(path):
+        with open(name, encoding='utf-8') as source:
+            for line in source:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class Group:
+    def __init__(self):
+        self.slow = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.duplicates = 0
+        self.max_repeats = 0
+        self.views = Counter()
+        self.origins = Counter()
+
+    def add(self, record):
+        if record['kind'] == 'slow':
+            self.slow += 1
+            self.total_ms += record['ms']
+            self.max_ms = max(self.max_ms, record['ms'])
+        else:
+            self.duplicates += 1
+            self.max_repeats = max(self.max_repeats, record['count'])
+        self.views[record['view']] += 1
+        origin = record.get('origin') or {}
+        self.origins[' | '.join(
+            part for part in dict.fromkeys((
+                origin.get('code'), origin.get('view'),
+                origin.get('template'), origin.get('tag'),
+            )) if part
+        ) or '?'] += 1
+
+
+class Command(BaseCommand):
+    help = ('Сводка журнала медленных и повторяющихся запросов, '
+            'сгруппированная по форме SQL')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--kind', choices=('slow', 'duplicate'))
+
+    def handle(self, *args, **options):
+        groups = defaultdict(Group)
+        for record in _records(options['log']):
+            if options['kind'] and record['kind'] != options['kind']:
+                continue
+            groups[record['sql']].add(record)
+        if not groups:
+            self.stdout.write('Журнал пуст')
+            return
+        ranked = sorted(
+            groups.items(),
+            key=lambda item: (item[1].total_ms, item[1].duplicates),
+            reverse=True,
+        )
+        for sql, group in ranked[:options['limit']]:
+            self.stdout.write(
+                'медленных {}, всего {:.1f} мс, максимум {:.1f} мс; '
+                'повторов {}, до {} раз за запрос'.format(
+                    group.slow, group.total_ms, group.max_ms,
+                    group.duplicates, group.max_repeats,
+                )
+            )
+            self.stdout.write('  ' + sql)
+            views = ', '.join(
+                '{} ({})'.format(view, count)
+                for view, count in group.views.most_common(3)
+            )
+            self.stdout.write('  страницы: ' + views)
+            for where, count in group.origins.most_common(3):
+                self.stdout.write('  {} × {}'.format(count, where))
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts import feed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок (FeedEntry) из таблицы подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+        else:
+            feed.reset_pulled()
+        for count, user in enumerate(users.iterator(), 1):
+            feed.rebuild(user)
+            if count % 1000 == 0:
+                self.stdout.write(f'{count} лент пересобрано')
+        self.stdout.write(self.style.SUCCESS('Ленты подписок пересобраны'))
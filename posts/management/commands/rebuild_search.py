@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts import fulltext
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс по постам и комментариям'
+
+    def handle(self, *args, **options):
+        fulltext.backend().clear()
+        ids = Post.objects.order_by('id').values_list('id', flat=True)
+        for count, post_id in enumerate(ids.iterator(), 1):
+            fulltext.reindex(post_id)
+            if count % 1000 == 0:
+                self.stdout.write(f'{count} постов проиндексировано')
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс пересобран'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import tags
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заново извлекает теги и упоминания из текстов постов'
+
+    def handle(self, *args, **options):
+        posts = Post.objects.only('id', 'text').order_by('id')
+        for count, post in enumerate(posts.iterator(), 1):
+            tags.update(post)
+            if count % 1000 == 0:
+                self.stdout.write(f'{count} постов разобрано')
+        self.stdout.write(self.style.SUCCESS('Теги и упоминания пересобраны'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import threads
+
+
+class Command(BaseCommand):
+    help = 'Заново раскладывает комментарии по веткам ответов'
+
+    def handle(self, *args, **options):
+        count = threads.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ветки пересобраны: {count} комментариев'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заранее готовит размеры и форматы картинок для постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать и уже готовые'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image=None).only(
+            'id', 'image', 'image_variants'
+            )
+        count = 0
+        for post in posts.iterator():
+            if options['force'] or thumbnails.ready(post) is None:
+                thumbnails.generate(post.id, post.image.name)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Картинок подготовлено: {count}'
+        ))
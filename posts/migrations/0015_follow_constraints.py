@@ -0,0 +1,43 @@
+# Generated by Django 2.2.6 on 2026-10-17 18:30
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def drop_duplicates(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+    Follow.objects.filter(user=F('author')).delete()
+    keep = Follow.objects.values('user', 'author').annotate(
+        keep=Min('id')
+        ).values('keep')
+    Follow.objects.exclude(id__in=list(keep)).delete()
+
+    def count(field):
+        follows = Follow.objects.filter(**{field: OuterRef('user')}).order_by(
+            ).values(field).annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(follows), 0)
+
+    UserStats.objects.update(
+        followers_count=count('author'), following_count=count('user')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='follow_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.CheckConstraint(check=models.Q(_negated=True, user=models.F('author')), name='follow_not_self'),
+        ),
+    ]
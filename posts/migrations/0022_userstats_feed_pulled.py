@@ -0,0 +1,35 @@
+# Generated by Django 2.2.6 on 2026-10-17 18:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def mark_pulled(apps, schema_editor):
+    """Посты авторов сверх лимита до сих пор не рассылались."""
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+    limit = settings.FEED_FANOUT_LIMIT
+    overflow = Follow.objects.filter(
+        author=OuterRef('user')
+    ).values('id')[limit:limit + 1]
+    over = UserStats.objects.annotate(
+        overflow=Subquery(overflow)
+    ).filter(overflow__isnull=False).values('user')
+    UserStats.objects.filter(user__in=over).update(feed_pulled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_comment_thread_path_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='feed_pulled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_pulled, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models.constraints import UniqueConstraint
+from django.db.models import F, Q
+from django.db.models.constraints import CheckConstraint, UniqueConstraint
 
 User = get_user_model()
 
@@ -8,6 +9,7 @@ User = get_user_model()
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст', help_text='Пиши что хочешь')
     pub_date = models.DateTimeField('date published', auto_now_add=True)
+    updated = models.DateTimeField('date updated', auto_now=True)
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='author_posts'
         )
@@ -22,9 +24,31 @@ class Post(models.Model):
         help_text='Загружай',
         blank=True, null=True
         )
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # JSON с размерами и форматами картинки, см. posts.thumbnails.
+    image_variants = models.TextField(default='', editable=False)
+    tags = models.ManyToManyField(
+        'Tag', related_name='posts', blank=True, editable=False
+        )
+    mentions = models.ManyToManyField(
+        User, related_name='mentioned_in', blank=True, editable=False
+        )
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'
+                ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+                ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+                ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -39,6 +63,13 @@ class Group(models.Model):
         return self.title
 
 
+class Tag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
 class Comment(models.Model):
     post = models.ForeignKey(
         'Post', on_delete=models.CASCADE, related_name='comments',
@@ -55,6 +86,41 @@ class Comment(models.Model):
     created = models.DateTimeField(
         verbose_name='Дата создания',
         auto_now_add=True)
+    parent = models.ForeignKey(
+        'self', on_delete=models.CASCADE, related_name='replies',
+        null=True, blank=True, verbose_name='Ответ на'
+        )
+    # Дерево ответов хранится материализованным путём: path — id всех
+    # предков и самого комментария по 10 цифр, thread — корень ветки,
+    # position — порядковый номер комментария в ветке. Заполняет их
+    # posts.threads.place.
+    thread = models.ForeignKey(
+        'self', on_delete=models.CASCADE, related_name='+',
+        null=True, editable=False
+        )
+    path = models.CharField(max_length=255, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    position = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['post', 'created'], name='comment_post_created_idx'
+                ),
+            models.Index(
+                fields=['post', 'depth', 'created'],
+                name='comment_post_roots_idx'
+                ),
+            models.Index(
+                fields=['thread', 'position'],
+                name='comment_thread_idx'
+                ),
+            models.Index(
+                fields=['thread', 'path'],
+                name='comment_thread_path_idx'
+                ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -71,5 +137,68 @@ class Follow(models.Model):
         )
 
     class Meta:
-        UniqueConstraint(fields=['user', 'author'], name='follow',)
+        constraints = [
+            UniqueConstraint(fields=['user', 'author'], name='follow_unique'),
+            CheckConstraint(
+                check=~Q(user=F('author')), name='follow_not_self'
+                ),
+        ]
         db_table = 'follow'
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name='feed_entries'
+        )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE,
+        related_name='feed_entries'
+        )
+    # Копия post.pub_date: лента подписок сортируется и листается по
+    # индексу записей, не заглядывая в таблицу постов.
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['user', 'post'], name='feed_entry'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='feed_entry_user_date_idx'
+                ),
+        ]
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='stats'
+        )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Посты автора хоть раз не разослали (подписчиков было больше
+    # FEED_FANOUT_LIMIT): ленты читают их при запросе, пока
+    # rebuild_feeds не разложит их заново.
+    feed_pulled = models.BooleanField(default=False)
+
+
+class SearchTerm(models.Model):
+    """Строка обратного индекса: основа слова и сколько раз она есть
+    в посте вместе с комментариями."""
+
+    TERM_LENGTH = 64
+
+    term = models.CharField(max_length=TERM_LENGTH)
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE,
+        related_name='search_terms'
+        )
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'post'], name='search_term_idx'),
+        ]
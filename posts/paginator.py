@@ -0,0 +1,223 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import SimpleLazyObject
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    """Страница ленты без номера: только ссылки вперёд и назад.
+
+    load() возвращает (строки, has_next, has_previous) и вызывается при
+    первом обращении к странице, а не при её создании: если шаблон
+    взят из {% cache %}, в базу никто не пойдёт.
+
+    object_list — срез queryset, как у страниц django Paginator, с уже
+    выбранными строками: повторного запроса он не делает."""
+
+    def __init__(self, load, paginator, queryset=None):
+        self._load = load
+        self._loaded = None
+        self._queryset = queryset
+        self._object_list = None
+        self.paginator = paginator
+
+    def _get(self):
+        if self._loaded is None:
+            self._loaded = self._load()
+        return self._loaded
+
+    def _items(self):
+        return self._get()[0]
+
+    @property
+    def object_list(self):
+        if self._queryset is None:
+            return self._items()
+        if self._object_list is None:
+            queryset = self._queryset.all()
+            queryset._result_cache = self._items()
+            queryset._prefetch_done = True
+            self._object_list = queryset
+        return self._object_list
+
+    def __repr__(self):
+        return '<CursorPage of {} items>'.format(len(self))
+
+    def __len__(self):
+        return len(self._items())
+
+    def __getitem__(self, index):
+        return self._items()[index]
+
+    def __iter__(self):
+        return iter(self._items())
+
+    def has_next(self):
+        return self._get()[1]
+
+    def has_previous(self):
+        return self._get()[2]
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self._items()[-1])
+
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(
+            self._items()[0], previous=True
+        )
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (pub_date, id): без COUNT(*) и без OFFSET.
+
+    Если у запроса есть свой order_by, листается по нему; сортировать
+    можно и по аннотациям вида F('связь__поле')."""
+
+    ordering = ('-pub_date', '-id')
+
+    def __init__(self, object_list, per_page, ordering=None):
+        if ordering is None and object_list.query.order_by:
+            ordering = object_list.query.order_by
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        self.object_list = object_list.order_by(*self.ordering)
+        self.per_page = int(per_page)
+
+    def _fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def _field(self, name):
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def _value(self, obj, name):
+        if name not in self.object_list.query.annotations:
+            name = self._field(name).attname
+        return getattr(obj, name)
+
+    def encode_cursor(self, obj, previous=False):
+        values = [str(self._value(obj, name)) for name in self._fields()]
+        raw = json.dumps(['p' if previous else 'n'] + values)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, *values = json.loads(raw.decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        fields = self._fields()
+        if direction not in ('n', 'p') or len(values) != len(fields):
+            raise InvalidCursor(cursor)
+        try:
+            values = [
+                self._field(name).to_python(value)
+                for name, value in zip(fields, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+        if None in values:
+            raise InvalidCursor(cursor)
+        return direction == 'p', values
+
+    def _seek(self, values, previous):
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != previous
+            lookup = '{}__{}'.format(field, 'lt' if descending else 'gt')
+            condition |= Q(**equal, **{lookup: value})
+            equal[field] = value
+        return condition
+
+    def page(self, cursor=None):
+        previous, values = False, None
+        if cursor:
+            previous, values = self.decode_cursor(cursor)
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, previous))
+        if previous:
+            queryset = queryset.reverse()
+
+        def load():
+            items = list(queryset[:self.per_page + 1])
+            has_more = len(items) > self.per_page
+            items = items[:self.per_page]
+            if previous:
+                items.reverse()
+                return items, True, has_more
+            return items, has_more, values is not None
+        return CursorPage(load, self, queryset[:self.per_page])
+
+    def get_page(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+
+class _Window:
+    """Окно первой keyset-страницы для django Paginator: её строки и
+    ещё одна, если есть следующая страница. len() вместо COUNT(*)."""
+
+    def __init__(self, page):
+        self.page = page
+
+    def __len__(self):
+        return len(self.page) + self.page.has_next()
+
+
+def _numbered_page(paginator, cursors, number):
+    page = paginator.get_page(number)
+
+    def next_cursor():
+        if not page.has_next():
+            return None
+        return cursors.encode_cursor(page[-1])
+    page.next_cursor = next_cursor
+    return page
+
+
+def paginate(request, queryset, per_page):
+    """Контекст ленты. Без параметров и с ?cursor= — keyset, ?page=N —
+    старый режим со смещением только для явных ссылок на номер.
+
+    Ни страница, ни COUNT(*) не выполняются до шаблона: при попадании
+    в {% cache %} запросов ленты нет совсем."""
+    cursors = CursorPaginator(queryset, per_page)
+    cursor = request.GET.get('cursor')
+    number = request.GET.get('page')
+    if cursor is not None:
+        return {'page': cursors.get_page(cursor), 'paginator': cursors}
+    if number is None:
+        # Первая страница та же keyset-выборка, но в обёртке Paginator и
+        # Page, которых ждут шаблоны и клиенты первой страницы ленты.
+        first = cursors.page()
+        paginator = Paginator(_Window(first), per_page)
+        page = Page(first, 1, paginator)
+        page.next_cursor = first.next_cursor
+        return {'page': page, 'paginator': paginator}
+    paginator = Paginator(cursors.object_list, per_page)
+    page = SimpleLazyObject(
+        lambda: _numbered_page(paginator, cursors, number)
+    )
+    return {'page': page, 'paginator': paginator}
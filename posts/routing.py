@@ -0,0 +1,95 @@
+"""Чтение страниц лент с реплик, запись — только в основную базу.
+
+ReplicaMiddleware включает реплику для GET и HEAD к видам из
+REPLICA_VIEWS. ReplicaRouter отправляет туда чтения, пока в запросе
+не было записи. Запросы сессии, которая недавно писала, закреплены за
+основной базой на REPLICA_PIN_SECONDS через cookie, так что автор
+сразу видит свой новый пост.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# Сессии и кэш в БД читаются сразу после записи.
+PRIMARY_APPS = {'sessions', 'django_cache'}
+
+_local = threading.local()
+
+
+def current():
+    """Реплика, из которой читает текущий запрос, или None."""
+    return getattr(_local, 'replica', None)
+
+
+def mark_wrote():
+    """Отмечает запись в запросе этого потока: дальше он читает из
+    основной базы, а ответ закрепит сессию за ней."""
+    _local.replica = None
+    _local.wrote = True
+
+
+def take_wrote():
+    """Была ли запись в этом потоке с прошлого вызова. Для потоков
+    пула (posts.concurrency), где отметку не сбрасывает middleware."""
+    wrote = getattr(_local, 'wrote', False)
+    _local.wrote = False
+    return wrote
+
+
+@contextmanager
+def reading_from(replica):
+    """Читать из replica в этом потоке: так чтения запроса, вынесенные
+    в другие потоки (posts.concurrency), идут туда же."""
+    _local.replica = replica
+    try:
+        yield
+    finally:
+        _local.replica = None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = getattr(_local, 'replica', None)
+        if replica is None or model._meta.app_label in PRIMARY_APPS:
+            return PRIMARY
+        return replica
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != 'django_cache':
+            # После записи запрос дочитывает уже из основной базы.
+            mark_wrote()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _local.replica = None
+        _local.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = _local.wrote
+            _local.replica = None
+            _local.wrote = False
+        if wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (settings.REPLICA_DATABASES and
+                request.method in ('GET', 'HEAD') and
+                request.resolver_match.url_name in settings.REPLICA_VIEWS and
+                settings.REPLICA_PIN_COOKIE not in request.COOKIES):
+            _local.replica = random.choice(settings.REPLICA_DATABASES)
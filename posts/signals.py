@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counters, feed, fragments, fulltext, tags, threads
+from .models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+def push_to_followers(sender, instance, created, **kwargs):
+    if created:
+        feed.push_post(instance)
+
+
+@receiver(post_save, sender=User)
+def create_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        counters.bump(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.bump(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_comments(instance.post_id, 1)
+
+
+@receiver(post_save, sender=Comment)
+def place_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        threads.place(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.bump_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_feed(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        feed.backfill(instance.user_id, instance.author_id)
+
+
+def follow_deleted(user_id, author_id):
+    """Последствия удалённой подписки: лента, счётчики и версия ленты
+    подписок. Кроме обработчика, её вызывает profile_unfollow."""
+    feed.trim(user_id, author_id)
+    counters.bump(author_id, followers_count=-1)
+    counters.bump(user_id, following_count=-1)
+    fragments.bump_follow(user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow(sender, instance, **kwargs):
+    follow_deleted(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.bump(instance.author_id, followers_count=1)
+        counters.bump(instance.user_id, following_count=1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+def expire_feeds(sender, **kwargs):
+    fragments.bump_posts()
+
+
+@receiver(post_save, sender=Follow)
+def expire_follow_feed(sender, instance, **kwargs):
+    fragments.bump_follow(instance.user_id)
+
+
+@receiver(post_save, sender=Group)
+def expire_group_cards(sender, instance, created, **kwargs):
+    if not created:
+        Post.objects.filter(group=instance).update(updated=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    fulltext.reindex(instance.id)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    fulltext.backend().remove(instance.id)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, created, **kwargs):
+    if created:
+        fulltext.add_comment(instance.post_id, instance.text)
+    else:
+        fulltext.reindex(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    fulltext.remove_comment(instance.post_id, instance.text)
+
+
+@receiver(post_save, sender=Post)
+def index_tags(sender, instance, raw=False, **kwargs):
+    if not raw:
+        tags.update(instance)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_WAL:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
@@ -0,0 +1,120 @@
+"""Русский стеммер по алгоритму Snowball и разбиение текста на термины.
+
+https://snowballstem.org/algorithms/russian/stemmer.html
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile('[а-я]')
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    (),
+    ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+     'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+     'ая', 'яя', 'ою', 'ею'),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    (),
+    ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+     'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+     'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я'),
+)
+DERIVATIONAL = ('ость', 'ост')
+SUPERLATIVE = ('ейше', 'ейш')
+
+
+def _strip(rv, endings):
+    """Снимает самое длинное окончание из endings. Окончания первой
+    группы стоят только после «а» или «я», и эта буква остаётся.
+    Если окончание не подошло, возвращает None."""
+    first, second = endings
+    found = max(
+        (ending for ending in first + second if rv.endswith(ending)),
+        key=len, default=None,
+    )
+    if found is None:
+        return None
+    rest = rv[:-len(found)]
+    if found in second:
+        return rest
+    if rest.endswith(('а', 'я')):
+        return rest
+    return None
+
+
+def _region(word, start):
+    """Начало области после первой пары «гласная, согласная»."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    if not CYRILLIC_RE.search(word):
+        return word
+    rv_start = next(
+        (i + 1 for i, char in enumerate(word) if char in VOWELS), len(word)
+    )
+    r2 = _region(word, _region(word, 0))
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    stripped = _strip(rv, PERFECTIVE_GERUND)
+    if stripped is None:
+        reflexive = _strip(rv, REFLEXIVE)
+        if reflexive is not None:
+            rv = reflexive
+        stripped = _strip(rv, ADJECTIVE)
+        if stripped is not None:
+            participle = _strip(stripped, PARTICIPLE)
+            if participle is not None:
+                stripped = participle
+        else:
+            stripped = _strip(rv, VERB)
+            if stripped is None:
+                stripped = _strip(rv, NOUN)
+    if stripped is not None:
+        rv = stripped
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and \
+                len(prefix) + len(rv) - len(ending) >= r2:
+            rv = rv[:-len(ending)]
+            break
+
+    superlative = next(
+        (ending for ending in SUPERLATIVE if rv.endswith(ending)), None
+    )
+    if superlative is not None:
+        rv = rv[:-len(superlative)]
+        if rv.endswith('нн'):
+            rv = rv[:-1]
+    elif rv.endswith('нн') or rv.endswith('ь'):
+        rv = rv[:-1]
+    return prefix + rv
+
+
+def terms(text):
+    """Основы слов текста в порядке появления, с повторами."""
+    return [stem(word) for word in WORD_RE.findall(text)]
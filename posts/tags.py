@@ -0,0 +1,28 @@
+import re
+
+from django.contrib.auth import get_user_model
+
+from .models import Tag
+
+User = get_user_model()
+
+# «&» в просмотре назад — чтобы не принять за тег сущность вроде &#39;.
+TAG_RE = re.compile(r'(?<![\w#&])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.@+-]*\w)')
+
+
+def extract(text):
+    """Теги (в нижнем регистре) и имена упомянутых пользователей."""
+    tags = {tag.lower() for tag in TAG_RE.findall(text)}
+    usernames = set(MENTION_RE.findall(text))
+    return tags, usernames
+
+
+def update(post):
+    """Перезаписывает индексы тегов и упоминаний поста по его тексту."""
+    names, usernames = extract(post.text)
+    Tag.objects.bulk_create(
+        [Tag(name=name) for name in names], ignore_conflicts=True
+        )
+    post.tags.set(Tag.objects.filter(name__in=names))
+    post.mentions.set(User.objects.filter(username__in=usernames))
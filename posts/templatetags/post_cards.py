@@ -0,0 +1,101 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from posts import tags, thumbnails
+
+register = template.Library()
+
+CARD_KEY = 'post_card:{}:{}:{}'
+
+
+def card_slot(user, post):
+    """Вариант карточки: кнопки зависят только от того, кто смотрит."""
+    if not user.is_authenticated:
+        return 'anon'
+    if user.id == post.author_id:
+        return 'owner'
+    return 'user'
+
+
+def card_key(user, post):
+    return CARD_KEY.format(
+        post.id, post.updated.timestamp(), card_slot(user, post)
+        )
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Карточки постов ленты одним cache.get_many, недостающие
+    рендерятся и кладутся в кэш одним set_many."""
+    user = context['user']
+    posts = list(posts)
+    keys = [card_key(user, post) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missing[key] = render_to_string(
+                'includes/post_item.html', {'post': post, 'user': user}
+                )
+    if missing:
+        cache.set_many(missing, settings.CARD_CACHE_TTL)
+        cards.update(missing)
+    return mark_safe(''.join(cards[key] for key in keys))
+
+
+def _srcset(files):
+    return ', '.join(
+        '{} {}w'.format(default_storage.url(item['name']), item['width'])
+        for item in files
+    )
+
+
+@register.simple_tag
+def card_image(post):
+    """Данные для <picture> карточки из сохранённых размеров; если их
+    ещё нет, картинка ставится в очередь, а карточка показывает заглушку."""
+    variants = thumbnails.ready(post)
+    if variants is None:
+        thumbnails.queue(post)
+        return None
+    *sources, fallback = variants['sources']
+    main = next(
+        item for item in fallback['files']
+        if item['width'] == variants['width']
+    )
+    return {
+        'sources': [
+            {'type': source['type'], 'srcset': _srcset(source['files'])}
+            for source in sources
+        ],
+        'src': default_storage.url(main['name']),
+        'srcset': _srcset(fallback['files']),
+        'width': variants['width'],
+        'height': variants['height'],
+    }
+
+
+@register.filter(needs_autoescape=True)
+def link_tags(text, autoescape=True):
+    """Делает #теги и @упоминания в тексте поста ссылками."""
+    if autoescape:
+        text = conditional_escape(text)
+    text = tags.TAG_RE.sub(
+        lambda match: '<a href="{}">#{}</a>'.format(
+            reverse('tag', args=[match.group(1).lower()]), match.group(1)
+        ),
+        text,
+    )
+    text = tags.MENTION_RE.sub(
+        lambda match: '<a href="{}">@{}</a>'.format(
+            reverse('profile', args=[match.group(1)]), match.group(1)
+        ),
+        text,
+    )
+    return mark_safe(text)
@@ -0,0 +1,94 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.reader = User.objects.create(
+            username='Tihon', email='tihon@mail.com', password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2', email='tihon2@mail.com', password='qwerty123'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', description='Описание', slug='group'
+        )
+        for number in range(5):
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author,
+                group=cls.group if number % 2 else None,
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        if response.streaming:
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+        return response.status_code, json.loads(content.decode())
+
+    def test_index_pages_through_cursor(self):
+        """Курсор из next проходит ленту целиком без повторов"""
+        status, data = self.get(reverse('api_index'), limit=2)
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            set(data['items'][0]),
+            {'id', 'text', 'pub_date', 'author', 'group', 'comments_count'},
+        )
+        texts = [item['text'] for item in data['items']]
+        while data['next']:
+            _, data = self.get(
+                reverse('api_index'), limit=2, cursor=data['next']
+            )
+            texts.extend(item['text'] for item in data['items'])
+        self.assertEqual(texts, [f'Пост {n}' for n in range(4, -1, -1)])
+
+    def test_field_selection(self):
+        _, data = self.get(reverse('api_index'), fields='id,url')
+        self.assertEqual(set(data['items'][0]), {'id', 'url'})
+        status, data = self.get(reverse('api_index'), fields='id,password')
+        self.assertEqual(status, 400)
+        self.assertIn('password', data['error'])
+
+    def test_bad_cursor(self):
+        status, _ = self.get(reverse('api_index'), cursor='???')
+        self.assertEqual(status, 400)
+
+    def test_group_and_profile_heads(self):
+        _, data = self.get(reverse('api_group', args=[self.group.slug]))
+        self.assertEqual(data['group']['title'], 'Группа')
+        self.assertEqual(len(data['items']), 2)
+        _, data = self.get(reverse('api_profile', args=['Tihon2']))
+        self.assertEqual(data['author']['posts_count'], 5)
+        self.assertEqual(data['author']['followers_count'], 1)
+
+    def test_follow_needs_login(self):
+        status, _ = self.get(reverse('api_follow'))
+        self.assertEqual(status, 401)
+        self.client.force_login(self.reader)
+        status, data = self.get(reverse('api_follow'))
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data['items']), 5)
+
+    def test_post_detail(self):
+        post = Post.objects.first()
+        status, data = self.get(
+            reverse('api_post', args=['Tihon2', post.id]),
+            fields='text,author',
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {'text': post.text, 'author': 'Tihon2'})
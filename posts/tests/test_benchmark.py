@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Follow, Post
+
+
+class BenchmarkTest(TestCase):
+    def test_generate_and_benchmark(self):
+        """Генератор воспроизводим, а бенчмарк проходит URL для чтения"""
+        call_command(
+            'generate_data', users=20, groups=2, posts=50, comments=30,
+            follows=40, seed=7, stdout=StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertEqual(Follow.objects.count(), 40)
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            call_command('benchmark_feeds', requests=2, output=output,
+                         stdout=StringIO())
+            with open(output) as source:
+                results = json.load(source)
+            for name in ('index', 'group', 'profile', 'post',
+                         'follow_index'):
+                with self.subTest(name=name):
+                    self.assertIn(name, results)
+                    self.assertGreater(results[name]['queries'], 0)
+            for name in ('profile_follow', 'profile_unfollow', 'new_post',
+                         'add_comment', 'post_edit'):
+                with self.subTest(name=name):
+                    self.assertNotIn(name, results)
+            out = StringIO()
+            call_command('benchmark_feeds', requests=2, baseline=output,
+                         tolerance=100, stdout=out)
+            self.assertIn('Не хуже baseline', out.getvalue())
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+
+class BulkDataTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.user = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.group = Group.objects.create(
+            title='Группа', description='Описание', slug='group'
+        )
+        self.post = Post.objects.create(
+            text='Пост #тег', author=BulkDataTest.author, group=self.group
+        )
+        Post.objects.create(text='Без группы', author=BulkDataTest.author)
+        comment = Comment.objects.create(
+            text='Коммент', post=self.post, author=BulkDataTest.user
+        )
+        Comment.objects.create(
+            text='Ответ', post=self.post, author=BulkDataTest.author,
+            parent=comment,
+        )
+        Follow.objects.create(
+            user=BulkDataTest.user, author=BulkDataTest.author
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def snapshot(self):
+        return {
+            'groups': list(Group.objects.order_by('id').values()),
+            'posts': list(Post.objects.order_by('id').values(
+                'id', 'text', 'pub_date', 'author', 'group', 'image',
+                'comments_count',
+            )),
+            'comments': list(Comment.objects.order_by('id').values(
+                'id', 'post', 'author', 'text', 'created', 'parent',
+                'thread', 'path', 'depth', 'position',
+            )),
+            'follows': list(Follow.objects.values('user', 'author')),
+        }
+
+    def round_trip(self, fmt):
+        before = self.snapshot()
+        call_command('export_data', self.directory, format=fmt,
+                     batch_size=1, stdout=StringIO())
+        Follow.objects.all().delete()
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+        UserStats.objects.all().delete()
+        out = StringIO()
+        call_command('import_data', self.directory, format=fmt,
+                     batch_size=1, stdout=out)
+        self.assertEqual(self.snapshot(), before)
+        self.assertIn('строк/с', out.getvalue())
+        stats = UserStats.objects.get(user=BulkDataTest.author)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertTrue(Post.objects.get(pk=self.post.pk).tags.exists())
+
+    def test_jsonl_round_trip(self):
+        self.round_trip('jsonl')
+
+    def test_csv_round_trip(self):
+        self.round_trip('csv')
+
+    def test_unknown_user_is_reported(self):
+        call_command('export_data', self.directory, models=['follow'],
+                     stdout=StringIO())
+        Follow.objects.all().delete()
+        get_user_model().objects.filter(pk=BulkDataTest.user.pk).update(
+            username='Renamed'
+        )
+        with self.assertRaises(CommandError):
+            call_command('import_data', self.directory, models=['follow'],
+                         skip_derived=True, stdout=StringIO())
@@ -0,0 +1,32 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+
+class CacheHitRateTest(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+    def tearDown(self):
+        shutil.rmtree(self.location, ignore_errors=True)
+
+    def hit_rate(self):
+        out = StringIO()
+        call_command(
+            'cache_hit_rate', workers=2, keys=10, requests=50, stdout=out
+            )
+        line = out.getvalue().splitlines()[-1]
+        return float(line.split()[1].rstrip('%'))
+
+    def test_shared_backend_is_coherent_across_workers(self):
+        """Файловый кэш общий для процессов: промахи почти только на
+        первом чтении ключа"""
+        with override_settings(CACHES={'default': {
+            **settings.CACHE_BACKENDS['file'],
+            'LOCATION': self.location,
+        }}):
+            self.assertGreaterEqual(self.hit_rate(), 80.0)
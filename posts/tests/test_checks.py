@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase, override_settings
+
+from posts.checks import production_database, production_profile
+
+CACHED_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {'loaders': [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]},
+}]
+
+
+class ProductionProfileCheckTest(SimpleTestCase):
+    def ids(self):
+        return {error.id for error in production_profile(None)}
+
+    def test_development_is_not_checked(self):
+        with override_settings(PROFILE='development', PRODUCTION=False):
+            self.assertEqual(self.ids(), set())
+
+    def test_unknown_profile(self):
+        with override_settings(PROFILE='prod', PRODUCTION=False):
+            self.assertEqual(self.ids(), {'posts.E000'})
+
+    def test_production_without_tuning(self):
+        """Тестовая база без CONN_MAX_AGE и шаблоны без кэша не проходят"""
+        with override_settings(PROFILE='production', PRODUCTION=True,
+                               DEBUG=True):
+            self.assertEqual(self.ids(), {
+                'posts.E001', 'posts.E002', 'posts.E003', 'posts.E006',
+            })
+
+    def test_production_needs_own_secret_key(self):
+        with override_settings(PROFILE='production', PRODUCTION=True,
+                               SECRET_KEY='ключ из окружения'):
+            self.assertNotIn('posts.E006', self.ids())
+
+    def test_cached_loader_passes(self):
+        with override_settings(PROFILE='production', PRODUCTION=True,
+                               TEMPLATES=CACHED_TEMPLATES):
+            self.assertNotIn('posts.E003', self.ids())
+
+
+class ProductionDatabaseCheckTest(SimpleTestCase):
+    def test_registered_as_database_check(self):
+        self.assertIn('database', production_database.tags)
+
+    def test_in_memory_test_database_is_skipped(self):
+        with override_settings(PRODUCTION=True):
+            self.assertEqual(production_database(None), [])
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+
+@override_settings(COMMENTS_PER_PAGE=5)
+class CommentPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.author = User.objects.create(
+            username='Tihon', email='tihon@mail.com', password='qwerty123'
+        )
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        cls.url = reverse('post', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id,
+        })
+        cls.more_url = reverse('post_comments', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id,
+        })
+
+    def setUp(self):
+        self.client = Client()
+
+    def add_comments(self, count):
+        User = get_user_model()
+        start = Comment.objects.count()
+        for number in range(start, start + count):
+            reader = User.objects.create(username=f'reader{number}')
+            Comment.objects.create(
+                text=f'Коммент {number}', post=self.post, author=reader
+            )
+
+    def get(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), len(response.content)
+
+    def test_first_page_budget_does_not_grow(self):
+        """Запросы и размер страницы записи не зависят от числа
+        комментариев"""
+        self.add_comments(1)
+        single_queries, _ = self.get()
+        self.add_comments(5)
+        queries, size = self.get()
+        self.assertEqual(queries, single_queries)
+        self.add_comments(100)
+        more_queries, more_size = self.get()
+        self.assertEqual(more_queries, queries)
+        # Растут только номера в текстах и именах пяти комментариев.
+        self.assertLess(more_size - size, 100)
+
+    def test_more_comments_budget_does_not_grow(self):
+        self.add_comments(1)
+        cache.clear()
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(self.more_url)
+        self.add_comments(10)
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(self.more_url)
+        self.assertEqual(len(full), len(single))
+
+    def test_older_comments_are_loaded_by_cursor(self):
+        self.add_comments(12)
+        context = self.client.get(self.url).context
+        self.assertIsInstance(context['comments'], QuerySet)
+        page = context['comments_page']
+        self.assertEqual(
+            [comment.text for comment in page],
+            [f'Коммент {number}' for number in range(11, 6, -1)],
+        )
+
+        seen = [comment.text for comment in page]
+        cursor = page.next_cursor()
+        while cursor:
+            data = self.client.get(self.more_url, {'comments': cursor}).json()
+            seen.extend(
+                f'Коммент {number}' for number in range(12)
+                if f'Коммент {number}<' in data['html']
+            )
+            cursor = data['next']
+        self.assertCountEqual(
+            seen, [f'Коммент {number}' for number in range(12)]
+        )
+        self.assertContains(
+            self.client.get(self.more_url, {'comments': page.next_cursor()}),
+            'reader6',
+        )
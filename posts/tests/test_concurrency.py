@@ -0,0 +1,75 @@
+import threading
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+
+from posts import concurrency, instrumentation, routing
+from posts.models import Post
+
+
+def where():
+    return threading.current_thread().name, routing.current()
+
+
+class GatherTest(SimpleTestCase):
+    @override_settings(CONCURRENT_LOOKUPS=True)
+    def test_runs_in_pool_with_request_replica(self):
+        """Остальные функции идут в пул и читают из той же реплики"""
+        main = threading.current_thread().name
+        with routing.reading_from('replica1'):
+            first, second, third = concurrency.gather(where, where, where)
+        self.assertEqual(first, (main, 'replica1'))
+        for name, replica in (second, third):
+            self.assertTrue(name.startswith('lookup'))
+            self.assertEqual(replica, 'replica1')
+
+    @override_settings(CONCURRENT_LOOKUPS=True)
+    def test_write_in_pool_pins_request(self):
+        """Запись в потоке пула видна запросу: он уходит с реплики"""
+        def write():
+            return routing.ReplicaRouter().db_for_write(Post)
+
+        self.addCleanup(routing.take_wrote)
+        routing.take_wrote()
+        with routing.reading_from('replica1'):
+            concurrency.gather(where, write)
+            self.assertIsNone(routing.current())
+        self.assertTrue(routing.take_wrote())
+        concurrency.gather(where, where)
+        self.assertFalse(routing.take_wrote())
+
+    @override_settings(CONCURRENT_LOOKUPS=True)
+    def test_recorder_counts_pool_queries(self):
+        recorder = instrumentation.Recorder()
+
+        def query():
+            for _ in range(200):
+                recorder.execute(
+                    lambda *args: None, 'SELECT 1', None, False, None
+                )
+
+        concurrency.gather(*[query] * 4)
+        self.assertEqual(recorder.queries, 800)
+        self.assertEqual(recorder.shapes['SELECT ?'], 800)
+
+    @override_settings(CONCURRENT_LOOKUPS=False)
+    def test_sequential_when_disabled(self):
+        main = threading.current_thread().name
+        self.assertEqual(
+            concurrency.gather(where, where), [(main, None), (main, None)]
+        )
+
+
+class LoadTestTest(LiveServerTestCase):
+    def test_reports_every_level(self):
+        call_command(
+            'generate_data', users=10, groups=2, posts=20, comments=10,
+            follows=15, seed=3, stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command('load_test', self.live_server_url, concurrency=[1],
+                     requests=10, stdout=out)
+        line, = out.getvalue().splitlines()
+        self.assertIn('c=1', line)
+        self.assertTrue(line.endswith('ошибок 0'))
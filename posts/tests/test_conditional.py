@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.author = User.objects.create(
+            username='Tihon', email='tihon@mail.com', password='qwerty123'
+        )
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        cls.post_url = reverse('post', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id,
+        })
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def revalidate(self, url, response):
+        return self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code
+
+    def test_unchanged_feed_is_304_without_queries(self):
+        """Повторный запрос неизменной ленты не трогает базу"""
+        url = reverse('index')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(url, response), 304)
+        # Версии точнее секунды: If-Modified-Since не поддерживаем.
+        self.assertNotIn('Last-Modified', response)
+
+        Post.objects.create(text='Новый', author=self.author)
+        self.assertEqual(self.revalidate(url, response), 200)
+
+    def test_other_page_has_other_etag(self):
+        first = self.client.get(reverse('index'))
+        second = self.client.get(reverse('index'), {'page': 2})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_post_changes_with_comments(self):
+        response = self.client.get(self.post_url)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.revalidate(self.post_url, response), 304)
+        Comment.objects.create(
+            text='Коммент', post=self.post, author=self.author
+        )
+        self.assertEqual(self.revalidate(self.post_url, response), 200)
+
+    def test_etag_depends_on_user(self):
+        response = self.client.get(self.post_url)
+        self.client.force_login(self.author)
+        self.assertEqual(self.revalidate(self.post_url, response), 200)
+
+    def test_missing_post_is_404(self):
+        self.assertEqual(self.client.get(reverse('post', kwargs={
+            'username': self.author.username, 'post_id': 999,
+        })).status_code, 404)
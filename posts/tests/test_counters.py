@@ -0,0 +1,112 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Comment, Follow, Post, UserStats
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.reader = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+        cls.client_reader = Client()
+        cls.client_reader.force_login(cls.reader)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_posts_and_comments_are_counted(self):
+        """Создание и удаление постов и комментариев меняет счётчики"""
+        post = Post.objects.create(text='Пост', author=CountersTest.author)
+        comment = Comment.objects.create(
+            text='Коммент', post=post, author=CountersTest.reader
+            )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(CountersTest.author).posts_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        post.delete()
+        self.assertEqual(self.stats(CountersTest.author).posts_count, 0)
+
+    def test_follows_are_counted(self):
+        """Подписка и отписка меняют счётчики обеих сторон"""
+        CountersTest.client_reader.get(reverse(
+            'profile_follow', kwargs={'username': CountersTest.author.username}
+            ))
+        self.assertEqual(self.stats(CountersTest.author).followers_count, 1)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 1)
+        response = CountersTest.client_reader.get(reverse(
+            'profile', kwargs={'username': CountersTest.author.username}
+            ))
+        self.assertEqual(response.context['follower'], 1)
+        CountersTest.client_reader.get(reverse(
+            'profile_unfollow',
+            kwargs={'username': CountersTest.author.username}
+            ))
+        self.assertEqual(self.stats(CountersTest.author).followers_count, 0)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 0)
+
+    def test_orm_unfollow_is_counted(self):
+        """Удаление подписки через ORM тоже уменьшает счётчики"""
+        Follow.objects.create(
+            user=CountersTest.reader, author=CountersTest.author
+            )
+        Follow.objects.filter(user=CountersTest.reader).delete()
+        self.assertEqual(self.stats(CountersTest.author).followers_count, 0)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 0)
+
+    def test_failed_unfollow_keeps_counters(self):
+        """Сбой в последствиях отписки откатывает и само удаление"""
+        Follow.objects.create(
+            user=CountersTest.reader, author=CountersTest.author
+            )
+        url = reverse(
+            'profile_unfollow',
+            kwargs={'username': CountersTest.author.username}
+            )
+        with mock.patch.object(
+                counters, 'bump', side_effect=[None, RuntimeError]):
+            with self.assertRaises(RuntimeError):
+                CountersTest.client_reader.get(url)
+        self.assertTrue(Follow.objects.filter(
+            user=CountersTest.reader, author=CountersTest.author
+            ).exists())
+        self.assertEqual(self.stats(CountersTest.author).followers_count, 1)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 1)
+
+    def test_rebuild_counters_command(self):
+        """Команда rebuild_counters исправляет расхождения"""
+        post = Post.objects.create(text='Пост', author=CountersTest.author)
+        Comment.objects.create(
+            text='Коммент', post=post, author=CountersTest.reader
+            )
+        Follow.objects.create(
+            user=CountersTest.reader, author=CountersTest.author
+            )
+        UserStats.objects.all().delete()
+        Post.objects.update(comments_count=0)
+        call_command('rebuild_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        stats = self.stats(CountersTest.author)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 1)
@@ -0,0 +1,124 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import feed
+from posts.models import FeedEntry, Follow, Post
+
+
+class FeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.reader = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+        cls.other = User.objects.create(
+            username='Tihon3',
+            email='tihon3@mail.com',
+            password='qwerty123'
+        )
+        cls.old_post = Post.objects.create(text='Старый', author=cls.author)
+        cls.client_reader = Client()
+        cls.client_reader.force_login(cls.reader)
+
+    def feed(self):
+        response = FeedTest.client_reader.get(reverse('follow_index'))
+        return list(response.context['page'])
+
+    def follow(self):
+        FeedTest.client_reader.get(reverse(
+            'profile_follow', kwargs={'username': FeedTest.author.username}
+            ))
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """Подписка заполняет ленту старыми постами, отписка очищает"""
+        self.follow()
+        self.assertTrue(FeedEntry.objects.filter(
+            user=FeedTest.reader, post=FeedTest.old_post
+            ).exists())
+        self.assertEqual(self.feed(), [FeedTest.old_post])
+        FeedTest.client_reader.get(reverse(
+            'profile_unfollow', kwargs={'username': FeedTest.author.username}
+            ))
+        self.assertFalse(FeedEntry.objects.filter(user=FeedTest.reader))
+        self.assertEqual(self.feed(), [])
+
+    def test_orm_follow_fills_and_trims_feed(self):
+        """Подписка и отписка через ORM тоже меняют ленту"""
+        follow = Follow.objects.create(
+            user=FeedTest.reader, author=FeedTest.author
+            )
+        self.assertEqual(self.feed(), [FeedTest.old_post])
+        follow.delete()
+        self.assertFalse(FeedEntry.objects.filter(user=FeedTest.reader))
+
+    def test_follow_feed_cursor_walk(self):
+        """Курсоры ленты подписок берутся из записей FeedEntry"""
+        self.follow()
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=FeedTest.author) for i in range(14)
+            )
+        call_command('rebuild_feeds', stdout=StringIO())
+        expected = list(Post.objects.order_by('-pub_date', '-id'))
+        response = FeedTest.client_reader.get(reverse('follow_index'))
+        seen = list(response.context['page'])
+        cursor = response.context['page'].next_cursor()
+        while cursor:
+            page = FeedTest.client_reader.get(
+                reverse('follow_index'), {'cursor': cursor}
+                ).context['page']
+            seen.extend(page)
+            cursor = page.next_cursor()
+        self.assertEqual(seen, expected)
+
+    def test_new_post_is_pushed_to_followers(self):
+        """Новый пост попадает в ленты подписчиков и только к ним"""
+        self.follow()
+        post = Post.objects.create(text='Новый', author=FeedTest.author)
+        self.assertEqual(self.feed(), [post, FeedTest.old_post])
+        self.assertFalse(FeedEntry.objects.filter(user=FeedTest.other))
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_popular_author_is_pulled_on_read(self):
+        """Посты популярного автора не рассылаются, а читаются при запросе"""
+        Follow.objects.create(user=FeedTest.other, author=FeedTest.author)
+        self.follow()
+        post = Post.objects.create(text='Новый', author=FeedTest.author)
+        self.assertFalse(FeedEntry.objects.filter(post=post))
+        self.assertEqual(self.feed(), [post, FeedTest.old_post])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_author_back_under_limit_stays_pulled(self):
+        """После отписок не разосланные посты не пропадают из ленты"""
+        Follow.objects.create(user=FeedTest.other, author=FeedTest.author)
+        self.follow()
+        post = Post.objects.create(text='Новый', author=FeedTest.author)
+        Follow.objects.filter(user=FeedTest.other).delete()
+        self.assertFalse(FeedEntry.objects.filter(post=post))
+        self.assertEqual(self.feed(), [post, FeedTest.old_post])
+
+        call_command('rebuild_feeds', stdout=StringIO())
+        self.assertFalse(feed.is_pulled(FeedTest.author.id))
+        self.assertTrue(FeedEntry.objects.filter(
+            user=FeedTest.reader, post=post
+            ))
+        self.assertEqual(self.feed(), [post, FeedTest.old_post])
+
+    def test_rebuild_feeds_command(self):
+        """Команда rebuild_feeds восстанавливает ленту по подпискам"""
+        Follow.objects.create(user=FeedTest.reader, author=FeedTest.author)
+        FeedEntry.objects.all().delete()
+        call_command('rebuild_feeds', stdout=StringIO())
+        self.assertEqual(self.feed(), [FeedTest.old_post])
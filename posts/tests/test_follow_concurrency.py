@@ -0,0 +1,105 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, OperationalError, connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Follow, UserStats
+
+User = get_user_model()
+
+
+class FollowConstraintTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+
+    def test_duplicate_follow_is_rejected(self):
+        Follow.objects.create(
+            user=FollowConstraintTest.user, author=FollowConstraintTest.author
+            )
+        with self.assertRaises(IntegrityError):
+            Follow.objects.create(
+                user=FollowConstraintTest.user,
+                author=FollowConstraintTest.author
+                )
+
+    def test_self_follow_is_rejected(self):
+        with self.assertRaises(IntegrityError):
+            Follow.objects.create(
+                user=FollowConstraintTest.user,
+                author=FollowConstraintTest.user
+                )
+
+
+class FollowConcurrencyTest(TransactionTestCase):
+    """Параллельные клики подписки и отписки не плодят дубликатов"""
+
+    workers = 8
+
+    def setUp(self):
+        self.user = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        self.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+
+    def fire(self, url_name):
+        barrier = threading.Barrier(self.workers)
+        url = reverse(url_name, kwargs={'username': self.author.username})
+
+        def click(client):
+            barrier.wait()
+            try:
+                client.get(url)
+            except OperationalError:
+                # SQLite может отказать в блокировке: клик потерян,
+                # но не задвоен.
+                pass
+            finally:
+                connection.close()
+
+        clients = []
+        for _ in range(self.workers):
+            client = Client()
+            client.force_login(self.user)
+            clients.append(client)
+        threads = [
+            threading.Thread(target=click, args=(client,))
+            for client in clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_parallel_follow_and_unfollow(self):
+        self.fire('profile_follow')
+        self.assertEqual(
+            Follow.objects.filter(user=self.user, author=self.author).count(),
+            1
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).followers_count, 1
+        )
+        self.fire('profile_unfollow')
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).followers_count, 0
+        )
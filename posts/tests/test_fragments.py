@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Post
+
+
+class FragmentCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.reader = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+        cls.other = User.objects.create(
+            username='Tihon3',
+            email='tihon3@mail.com',
+            password='qwerty123'
+        )
+        cls.client_reader = Client()
+        cls.client_reader.force_login(cls.reader)
+        cls.client_other = Client()
+        cls.client_other.force_login(cls.other)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_new_post_is_visible_at_once(self):
+        """Новый пост виден на главной без ожидания срока жизни кэша"""
+        self.assertNotContains(
+            FragmentCacheTest.client_reader.get(reverse('index')), 'Свежий'
+            )
+        Post.objects.create(text='Свежий', author=FragmentCacheTest.author)
+        self.assertContains(
+            FragmentCacheTest.client_reader.get(reverse('index')), 'Свежий'
+            )
+
+    def test_follow_feed_does_not_leak_between_users(self):
+        """Закэшированная лента подписок не показывается другому"""
+        Follow.objects.create(
+            user=FragmentCacheTest.reader, author=FragmentCacheTest.author
+            )
+        Post.objects.create(text='Для подписчиков',
+                            author=FragmentCacheTest.author)
+        self.assertContains(
+            FragmentCacheTest.client_reader.get(reverse('follow_index')),
+            'Для подписчиков'
+            )
+        self.assertNotContains(
+            FragmentCacheTest.client_other.get(reverse('follow_index')),
+            'Для подписчиков'
+            )
+
+    def test_follow_change_expires_follow_feed(self):
+        """Подписка сразу меняет ленту подписок"""
+        Post.objects.create(text='Старый пост',
+                            author=FragmentCacheTest.author)
+        self.assertNotContains(
+            FragmentCacheTest.client_reader.get(reverse('follow_index')),
+            'Старый пост'
+            )
+        FragmentCacheTest.client_reader.get(reverse(
+            'profile_follow',
+            kwargs={'username': FragmentCacheTest.author.username}
+            ))
+        self.assertContains(
+            FragmentCacheTest.client_reader.get(reverse('follow_index')),
+            'Старый пост'
+            )
@@ -0,0 +1,88 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть в SQLite')
+class QueryPlanTest(TestCase):
+    """Ленты и комментарии читаются по индексам, без полного прохода"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.reader = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', description='Описание', slug='group'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(
+            text='Коммент', post=cls.post, author=cls.reader
+        )
+        cls.client_reader = Client()
+        cls.client_reader.force_login(cls.reader)
+
+    def plans(self, url):
+        """Планы всех упорядоченных выборок постов и комментариев."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            QueryPlanTest.client_reader.get(url)
+        plans = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or 'ORDER BY' not in sql:
+                continue
+            if 'FROM "posts_post"' not in sql and \
+                    'FROM "posts_comment"' not in sql:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        self.assertTrue(plans, url)
+        return plans
+
+    def assert_indexed(self, url):
+        for sql, plan in self.plans(url):
+            for step in plan:
+                self.assertFalse(
+                    step.startswith('SCAN') and 'USING' not in step,
+                    f'Полный проход таблицы: {step}\n{sql}'
+                )
+                self.assertNotIn('TEMP B-TREE', step, sql)
+
+    def test_feeds_use_indexes(self):
+        self.assert_indexed(reverse('index'))
+        self.assert_indexed(
+            reverse('group', kwargs={'slug': QueryPlanTest.group.slug})
+        )
+        self.assert_indexed(
+            reverse('profile', kwargs={'username': QueryPlanTest.author})
+        )
+        self.assert_indexed(reverse('post', kwargs={
+            'username': QueryPlanTest.author.username,
+            'post_id': QueryPlanTest.post.id,
+        }))
+
+    def test_follow_feed_reads_its_inbox_in_order(self):
+        """Лента подписок листается по индексу (user, -pub_date, -post)
+        записей, без сортировки"""
+        self.assert_indexed(reverse('follow_index'))
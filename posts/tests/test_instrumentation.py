@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts import instrumentation
+from posts.models import Post
+
+
+class InstrumentationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.author = User.objects.create(
+            username='Tihon', email='tihon@mail.com', password='qwerty123'
+        )
+        cls.admin = User.objects.create(
+            username='admin', email='admin@mail.com', password='qwerty123',
+            is_staff=True,
+        )
+        Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        instrumentation._histograms.clear()
+        self.client = Client()
+
+    @override_settings(INSTRUMENTATION_HEADERS=True)
+    def test_headers(self):
+        """Ответ несёт имя URL, число запросов, кэш и время рендера"""
+        response = self.client.get(reverse('index'))
+        self.assertEqual(response['X-View'], 'index')
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+        self.assertGreater(int(response['X-Cache-Misses']), 0)
+        self.assertGreater(float(response['X-Template-Time']), 0)
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+        response = self.client.get(reverse('index'))
+        self.assertGreater(int(response['X-Cache-Hits']), 0)
+
+    @override_settings(INSTRUMENTATION_HEADERS=False)
+    def test_no_headers(self):
+        response = self.client.get(reverse('index'))
+        self.assertNotIn('X-DB-Queries', response)
+
+    def test_report_is_staff_only(self):
+        self.client.get(reverse('index'))
+        self.client.get(reverse('index'))
+
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('instrumentation'))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(self.admin)
+        views = self.client.get(reverse('instrumentation')).json()['views']
+        self.assertEqual(views['index']['count'], 2)
+        self.assertEqual(sum(views['index']['wall_ms'].values()), 2)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged(self):
+        with self.assertLogs('posts.queries') as logs:
+            self.client.get(reverse('index'))
+        records = [json.loads(record.getMessage()) for record in logs.records]
+        slow = [record for record in records if record['kind'] == 'slow']
+        self.assertTrue(slow)
+        self.assertEqual(slow[0]['view'], 'index')
+        # Ближайшая строка — пагинатор или шаблон, но сам вид тоже указан.
+        self.assertTrue(slow[0]['origin']['code'])
+        views = [record['origin']['view'] for record in slow]
+        self.assertTrue(all(views))
+        self.assertTrue(all(
+            view.startswith('posts/views.py:') and view.endswith(' in index')
+            for view in views
+        ))
+
+    def test_log_directory_is_created_on_first_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'logs', 'queries.log')
+            handler = instrumentation.QueryLogHandler(path)
+            self.assertFalse(os.path.exists(os.path.dirname(path)))
+            handler.emit(logging.makeLogRecord({'msg': 'запрос'}))
+            handler.close()
+            with open(path, encoding='utf-8') as log:
+                self.assertEqual(log.read(), 'запрос\n')
+
+    @override_settings(SLOW_QUERY_MS=10 ** 6)
+    def test_duplicate_shapes_are_flagged(self):
+        """Одинаковые по форме запросы из шаблона попадают в журнал с
+        местом вызова"""
+        recorder = instrumentation.Recorder()
+        template = Template('{% for post in posts %}'
+                            '{{ post.comments.count }}{% endfor %}')
+        Post.objects.create(text='Ещё пост', author=self.author)
+        with connection.execute_wrapper(recorder.execute):
+            template.render(Context({'posts': Post.objects.all()}))
+        with self.assertLogs('posts.queries') as logs:
+            recorder.finish()
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['kind'], 'duplicate')
+        self.assertEqual(record['count'], 2)
+        self.assertEqual(record['origin']['tag'], 'post.comments.count')
+
+
+class QueryReportTest(SimpleTestCase):
+    def test_normalize(self):
+        self.assertEqual(
+            instrumentation.normalize(
+                "SELECT a FROM t WHERE id IN (%s, %s) AND b = 'x'  LIMIT 21"
+            ),
+            'SELECT a FROM t WHERE id IN (...) AND b = ? LIMIT ?',
+        )
+
+    def test_groups_by_sql(self):
+        records = [
+            {'kind': 'slow', 'view': 'index', 'sql': 'SELECT a',
+             'ms': 150.0, 'origin': {'code': 'posts/views.py:10 in index'}},
+            {'kind': 'slow', 'view': 'index', 'sql': 'SELECT a',
+             'ms': 250.0, 'origin': {'code': 'posts/views.py:10 in index'}},
+            {'kind': 'duplicate', 'view': 'profile', 'sql': 'SELECT b',
+             'count': 3, 'origin': {'template': 'posts/profile.html:5'}},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'queries.log')
+            with open(path, 'w', encoding='utf-8') as log:
+                for record in records:
+                    log.write(json.dumps(record) + '\n')
+            out = StringIO()
+            call_command('query_report', log=path, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn(
+            'медленных 2, всего 400.0 мс, максимум 250.0 мс', lines[0]
+        )
+        self.assertEqual(lines[1].strip(), 'SELECT a')
+        self.assertIn('до 3 раз за запрос', out.getvalue())
@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.paginator import CursorPage, CursorPaginator
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.user = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.group = Group.objects.create(
+            title='test-group',
+            description='test-description',
+            slug='test_slug'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Test-{i}', author=cls.user, group=cls.group)
+            for i in range(25)
+        )
+        cls.guest = Client()
+
+    def walk(self, url):
+        seen = []
+        response = CursorPaginatorTest.guest.get(url)
+        page = response.context['page']
+        seen.extend(page)
+        while page.next_cursor():
+            response = CursorPaginatorTest.guest.get(
+                url, {'cursor': page.next_cursor()}
+                )
+            page = response.context['page']
+            self.assertIsInstance(page, CursorPage)
+            seen.extend(page)
+        return seen, page
+
+    def test_cursor_walk_returns_every_post_once(self):
+        """Курсоры проходят всю ленту без пропусков и повторов"""
+        expected = list(Post.objects.order_by('-pub_date', '-id'))
+        for url in (
+            reverse('index'),
+            reverse('group', kwargs={'slug': 'test_slug'}),
+            reverse('profile', kwargs={'username': 'Tihon'}),
+        ):
+            with self.subTest(url=url):
+                seen, last = self.walk(url)
+                self.assertEqual(seen, expected)
+                self.assertFalse(last.has_next())
+                self.assertTrue(last.has_previous())
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Курсор назад возвращает предыдущую страницу"""
+        first = CursorPaginatorTest.guest.get(reverse('index'))
+        first_page = list(first.context['page'])
+        second = CursorPaginatorTest.guest.get(
+            reverse('index'), {'cursor': first.context['page'].next_cursor()}
+            ).context['page']
+        back = CursorPaginatorTest.guest.get(
+            reverse('index'), {'cursor': second.previous_cursor()}
+            ).context['page']
+        self.assertEqual(list(back), first_page)
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_cursor_page_skips_count(self):
+        """В режиме курсора нет COUNT(*) и OFFSET"""
+        page = CursorPaginator(Post.objects.all(), 10).page()
+        with CaptureQueriesContext(connection) as queries:
+            CursorPaginatorTest.guest.get(
+                reverse('index'), {'cursor': page.next_cursor()}
+                )
+        sql = ' '.join(query['sql'] for query in queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_first_page_is_keyset(self):
+        """Без ?page= и ?cursor= первая страница тоже без COUNT(*) и OFFSET"""
+        with CaptureQueriesContext(connection) as queries:
+            response = CursorPaginatorTest.guest.get(reverse('index'))
+        sql = ' '.join(query['sql'] for query in queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+        page = response.context['page']
+        self.assertEqual(len(page), 10)
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.next_cursor())
+
+    def test_cached_fragment_skips_page_queries(self):
+        """При попадании в кэш фрагмента ни страница, ни COUNT(*) не
+        выполняются"""
+        for params in ({}, {'page': 2}):
+            with self.subTest(params=params):
+                CursorPaginatorTest.guest.get(reverse('index'), params)
+                with CaptureQueriesContext(connection) as queries:
+                    CursorPaginatorTest.guest.get(reverse('index'), params)
+                sql = ' '.join(query['sql'] for query in queries)
+                self.assertNotIn('"posts_post"', sql)
+
+    def test_page_number_fallback(self):
+        """Старые ссылки ?page= продолжают работать"""
+        response = CursorPaginatorTest.guest.get(
+            reverse('index'), {'page': 3}
+            )
+        page = response.context['page']
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+        self.assertIsNone(page.next_cursor())
+
+    def test_invalid_cursor_shows_first_page(self):
+        """Испорченный курсор открывает первую страницу"""
+        for cursor in ('garbage', 'WyJuIl0', ''):
+            with self.subTest(cursor=cursor):
+                response = CursorPaginatorTest.guest.get(
+                    reverse('index'), {'cursor': cursor}
+                    )
+                page = response.context['page']
+                self.assertEqual(
+                    page[0], Post.objects.order_by('-pub_date', '-id')[0]
+                    )
+                self.assertFalse(page.has_previous())
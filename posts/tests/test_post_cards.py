@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from posts.models import Comment, Post
+from posts.templatetags.post_cards import card_key
+
+
+class PostCardsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.author = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.reader = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Первый', author=PostCardsTest.author
+            )
+        self.other_post = Post.objects.create(
+            text='Второй', author=PostCardsTest.author
+            )
+
+    def render(self, user):
+        template = Template('{% load post_cards %}{% post_cards posts %}')
+        return template.render(Context({
+            'posts': Post.objects.all(),
+            'user': user,
+        }))
+
+    def test_card_is_served_from_cache(self):
+        """Повторный рендер берёт карточку из кэша"""
+        self.render(PostCardsTest.reader)
+        Post.objects.filter(pk=self.post.pk).update(text='Подменённый')
+        self.assertIn('Первый', self.render(PostCardsTest.reader))
+
+    def test_edit_and_comment_expire_only_their_card(self):
+        """Правка и комментарий обновляют только свою карточку"""
+        self.render(PostCardsTest.reader)
+        other_key = card_key(PostCardsTest.reader, self.other_post)
+        self.post.text = 'Исправленный'
+        self.post.save()
+        Comment.objects.create(
+            text='Коммент', post=self.post, author=PostCardsTest.reader
+            )
+        html = self.render(PostCardsTest.reader)
+        self.assertIn('Исправленный', html)
+        self.assertIn('Комментариев: 1', html)
+        self.other_post.refresh_from_db()
+        self.assertEqual(
+            card_key(PostCardsTest.reader, self.other_post), other_key
+            )
+
+    def test_slots_per_viewer(self):
+        """Автор, читатель и аноним получают разные карточки"""
+        self.assertIn('Редактировать', self.render(PostCardsTest.author))
+        self.assertNotIn('Редактировать', self.render(PostCardsTest.reader))
+        self.assertNotIn(
+            'Добавить комментарий', self.render(AnonymousUser())
+            )
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+
+class FeedQueriesTest(TestCase):
+    """Число запросов на страницу ленты не зависит от числа постов"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.reader = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.author = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', description='Описание', slug='group'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.client_reader = Client()
+        cls.client_reader.force_login(cls.reader)
+
+    def add_posts(self, count):
+        for number in range(count):
+            post = Post.objects.create(
+                text=f'Пост {number}',
+                author=FeedQueriesTest.author,
+                group=FeedQueriesTest.group,
+            )
+            Comment.objects.create(
+                text='Коммент', post=post, author=FeedQueriesTest.reader
+            )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = FeedQueriesTest.client_reader.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        urls = [
+            reverse('index'),
+            reverse('group', kwargs={'slug': FeedQueriesTest.group.slug}),
+            reverse(
+                'profile',
+                kwargs={'username': FeedQueriesTest.author.username}
+            ),
+            reverse('follow_index'),
+        ]
+        self.add_posts(1)
+        single = [self.count_queries(url) for url in urls]
+        self.add_posts(9)
+        full = [self.count_queries(url) for url in urls]
+        self.assertEqual(single, full)
@@ -0,0 +1,74 @@
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve
+
+from posts.models import Post
+from posts.routing import ReplicaMiddleware, ReplicaRouter
+
+
+@override_settings(REPLICA_DATABASES=['replica1', 'replica2'])
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def run_view(self, request, view):
+        """Прогоняет запрос через ReplicaMiddleware, как это делает Django."""
+        def get_response(request):
+            match = resolve(request.path_info)
+            request.resolver_match = match
+            middleware.process_view(request, match.func, (), {})
+            return view()
+
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def test_feed_reads_go_to_replica(self):
+        used = []
+
+        def view():
+            used.append(self.router.db_for_read(Post))
+            used.append(self.router.db_for_read(Session))
+            return HttpResponse()
+
+        response = self.run_view(self.factory.get('/'), view)
+        self.assertIn(used[0], ['replica1', 'replica2'])
+        self.assertEqual(used[1], 'default')
+        self.assertNotIn('primary_pin', response.cookies)
+
+    def test_other_views_read_primary(self):
+        used = []
+
+        def view():
+            used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        self.run_view(self.factory.get('/new/'), view)
+        self.run_view(self.factory.post('/'), view)
+        self.assertEqual(used, ['default', 'default'])
+
+    def test_write_pins_session_to_primary(self):
+        """После записи чтения идут в основную базу, пока жива cookie"""
+        used = []
+
+        def write():
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        response = self.run_view(self.factory.get('/'), write)
+        self.assertEqual(used, ['default'])
+        self.assertEqual(response.cookies['primary_pin']['max-age'], 15)
+
+        def read():
+            used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        request = self.factory.get('/')
+        request.COOKIES['primary_pin'] = '1'
+        self.run_view(request, read)
+        self.assertEqual(used, ['default', 'default'])
+
+    def test_outside_request_reads_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
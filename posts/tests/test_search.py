@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import fulltext
+from posts.models import Comment, Post
+from posts.stemming import stem
+
+
+class StemmingTest(SimpleTestCase):
+    def test_russian_stems(self):
+        words = {
+            'кошками': 'кошк',
+            'красивая': 'красив',
+            'сидели': 'сидел',
+            'важнейшим': 'важн',
+            'ёлки': 'елк',
+            'Yatube': 'yatube',
+        }
+        for word, expected in words.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), expected)
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.user = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.guest = Client()
+
+    def setUp(self):
+        fulltext.backend.cache_clear()
+        self.cat = Post.objects.create(
+            text='Кошка спит на окне', author=SearchTest.user
+            )
+        self.cats = Post.objects.create(
+            text='Кошки, кошки, кошки повсюду', author=SearchTest.user
+            )
+        self.dog = Post.objects.create(
+            text='Собака гуляет', author=SearchTest.user
+            )
+
+    def tearDown(self):
+        fulltext.backend.cache_clear()
+
+    def search(self, query, cursor=None):
+        params = {'q': query}
+        if cursor:
+            params['cursor'] = cursor
+        response = SearchTest.guest.get(reverse('search'), params)
+        return response.context['page']
+
+    def check_search(self):
+        """Поиск находит словоформы, ранжирует и листается курсором"""
+        self.assertEqual(list(self.search('кошками')), [self.cats, self.cat])
+        comment = Comment.objects.create(
+            text='Тут нужна кошка', post=self.dog, author=SearchTest.user
+            )
+        self.assertIn(self.dog, list(self.search('кошку')))
+        self.assertEqual(list(self.search('собаку')), [self.dog])
+        self.assertEqual(list(self.search('кошка гуляет')), [self.dog])
+        comment.delete()
+        self.assertNotIn(self.dog, list(self.search('кошку')))
+        self.assertEqual(list(self.search('собаку')), [self.dog])
+        self.dog.delete()
+        self.assertEqual(list(self.search('собака')), [])
+
+    def check_cursor(self):
+        paginator = fulltext.SearchPaginator('кошка', 1)
+        first = paginator.page()
+        self.assertEqual(list(first), [self.cats])
+        second = paginator.page(first.next_cursor())
+        self.assertEqual(list(second), [self.cat])
+        self.assertFalse(second.has_next())
+
+    def test_new_comment_does_not_reread_comments(self):
+        """Новый комментарий индексируется без чтения остальных"""
+        for number in range(3):
+            Comment.objects.create(
+                text=f'Коммент {number}', post=self.dog,
+                author=SearchTest.user
+                )
+        with CaptureQueriesContext(connection) as queries:
+            Comment.objects.create(
+                text='Ещё коммент', post=self.dog, author=SearchTest.user
+                )
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('"posts_comment"."text"', sql)
+
+    def test_fts5_backend(self):
+        self.check_search()
+        self.check_cursor()
+
+    @override_settings(SEARCH_BACKEND='posts.fulltext.TableBackend')
+    def test_table_backend(self):
+        fulltext.backend.cache_clear()
+        for post in Post.objects.all():
+            fulltext.reindex(post.id)
+        self.check_search()
+        self.check_cursor()
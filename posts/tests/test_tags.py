@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, Tag
+from posts.tags import extract
+
+
+class TagsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.user = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.friend = User.objects.create(
+            username='Tihon2',
+            email='tihon2@mail.com',
+            password='qwerty123'
+        )
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.friend_client = Client()
+        cls.friend_client.force_login(cls.friend)
+
+    def test_extract(self):
+        tags, usernames = extract(
+            'Гуляем #Весна и #лето_2020 с @Tihon2. Почта a@b.ru, не #'
+        )
+        self.assertEqual(tags, {'весна', 'лето_2020'})
+        self.assertEqual(usernames, {'Tihon2'})
+
+    def test_tags_and_mentions_are_indexed_on_save_and_edit(self):
+        post = Post.objects.create(
+            text='Привет #весна @Tihon2 @nobody', author=TagsTest.user
+        )
+        self.assertEqual(list(post.tags.values_list('name', flat=True)),
+                         ['весна'])
+        self.assertEqual(list(post.mentions.all()), [TagsTest.friend])
+        TagsTest.authorized_client.post(
+            reverse('post_edit', kwargs={
+                'username': TagsTest.user.username, 'post_id': post.id,
+            }),
+            {'text': 'Теперь #лето'},
+        )
+        self.assertEqual(list(post.tags.values_list('name', flat=True)),
+                         ['лето'])
+        self.assertFalse(post.mentions.exists())
+
+    def test_tag_feed(self):
+        """Лента тега показывает только посты с этим тегом"""
+        tagged = Post.objects.create(text='#Весна пришла',
+                                     author=TagsTest.user)
+        Post.objects.create(text='Без тегов', author=TagsTest.user)
+        response = TagsTest.authorized_client.get(
+            reverse('tag', kwargs={'name': 'ВЕСНА'})
+        )
+        self.assertEqual(list(response.context['page']), [tagged])
+        self.assertContains(response, reverse('tag', args=['весна']))
+        self.assertTrue(Tag.objects.filter(name='весна').exists())
+
+    def test_mentions_feed(self):
+        """Лента упоминаний показывает посты, где упомянут читатель"""
+        mention = Post.objects.create(text='Привет, @Tihon2!',
+                                      author=TagsTest.user)
+        Post.objects.create(text='Привет всем', author=TagsTest.user)
+        response = TagsTest.friend_client.get(reverse('mentions'))
+        self.assertEqual(list(response.context['page']), [mention])
+        response = TagsTest.authorized_client.get(reverse('mentions'))
+        self.assertEqual(list(response.context['page']), [])
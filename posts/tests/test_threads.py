@@ -0,0 +1,133 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import threads
+from posts.models import Comment, Post
+
+
+class ThreadsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.author = User.objects.create(
+            username='Tihon', email='tihon@mail.com', password='qwerty123'
+        )
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+
+    def reply(self, parent=None, text='Коммент'):
+        return Comment.objects.create(
+            text=text, post=self.post, author=self.author, parent=parent
+        )
+
+    def test_path_orders_thread_depth_first(self):
+        root = self.reply(text='корень')
+        first = self.reply(root, 'первый')
+        self.reply(root, 'второй')
+        nested = self.reply(first, 'вложенный')
+        self.assertEqual(nested.path, first.path + threads.segment(nested.id))
+        self.assertEqual(
+            [(c.text, c.depth, c.position)
+             for c in threads.replies(self.post, root.id)],
+            [('первый', 1, 1), ('вложенный', 2, 3), ('второй', 1, 2)],
+        )
+
+    def test_position_follows_last_reply(self):
+        """position берётся из того же UPDATE и не повторяется после
+        удаления ответа"""
+        root = self.reply()
+        first = self.reply(root)
+        second = self.reply(root)
+        first.delete()
+        third = self.reply(root)
+        self.assertEqual((second.position, third.position), (2, 3))
+        third.refresh_from_db()
+        self.assertEqual(third.position, 3)
+
+    def test_all_replies_is_one_query(self):
+        """Число запросов ответа ?thread= не зависит от числа ответов"""
+        url = reverse('post_comments', kwargs={
+            'username': self.author.username, 'post_id': self.post.id,
+        })
+        root = self.reply()
+        self.reply(root)
+        with CaptureQueriesContext(connection) as single:
+            Client().get(url, {'thread': root.id})
+        for _ in range(10):
+            self.reply(root)
+        with CaptureQueriesContext(connection) as many:
+            Client().get(url, {'thread': root.id})
+        self.assertEqual(len(many), len(single))
+        with self.assertNumQueries(1):
+            self.assertEqual(len(threads.replies(self.post, root.id)), 11)
+
+    def test_preview_of_many_threads_is_one_query(self):
+        roots = [self.reply() for _ in range(3)]
+        for root in roots:
+            parent = root
+            for _ in range(4):
+                parent = self.reply(parent)
+        with self.assertNumQueries(1):
+            threads.attach(roots, 2)
+        for root in roots:
+            self.assertEqual(
+                [reply.depth for reply in root.thread_replies], [1, 2]
+            )
+            self.assertTrue(root.more_replies)
+
+    def test_rebuild_matches_place(self):
+        root = self.reply()
+        self.reply(self.reply(root))
+        self.reply(root)
+        before = list(Comment.objects.order_by('id').values_list(
+            'thread', 'path', 'depth', 'position'
+        ))
+        Comment.objects.update(thread=None, path='', depth=0, position=0)
+        out = StringIO()
+        call_command('rebuild_threads', stdout=out)
+        self.assertEqual(list(Comment.objects.order_by('id').values_list(
+            'thread', 'path', 'depth', 'position'
+        )), before)
+
+    @override_settings(COMMENT_MAX_DEPTH=2)
+    def test_reply_through_view(self):
+        """Ответ из формы попадает в ветку, но не глубже предела"""
+        client = Client()
+        client.force_login(self.author)
+        url = reverse('add_comment', kwargs={
+            'username': self.author.username, 'post_id': self.post.id,
+        })
+        root = self.reply()
+        child = self.reply(root)
+        grandchild = self.reply(child)
+        client.post(url, {'text': 'ответ', 'parent': child.id})
+        client.post(url, {'text': 'глубже', 'parent': grandchild.id})
+        reply = Comment.objects.get(text='ответ')
+        self.assertEqual((reply.parent, reply.depth), (child, 2))
+        deep = Comment.objects.get(text='глубже')
+        self.assertEqual((deep.parent, deep.depth), (child, 2))
+
+        client.post(url + '?reply={}'.format(root.id), {'text': 'по ссылке'})
+        linked = Comment.objects.get(text='по ссылке')
+        self.assertEqual((linked.parent, linked.depth), (root, 1))
+
+        other = Post.objects.create(text='Другой', author=self.author)
+        client.post(reverse('add_comment', kwargs={
+            'username': self.author.username, 'post_id': other.id,
+        }), {'text': 'чужой', 'parent': root.id})
+        self.assertFalse(Comment.objects.filter(text='чужой').exists())
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_threads', width=20, depth=5, threads=3,
+                     stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertIn('запросов      1', lines[0])
+        self.assertFalse(Comment.objects.exists())
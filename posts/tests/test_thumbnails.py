@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import thumbnails
+from posts.models import Post
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(THUMBNAIL_ASYNC=False, MEDIA_ROOT=MEDIA_ROOT)
+class ThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.user = User.objects.create(
+            username='Tihon',
+            email='tihon@mail.com',
+            password='qwerty123'
+        )
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def upload(self, name):
+        return SimpleUploadedFile(
+            name=name, content=SMALL_GIF, content_type='image/gif'
+        )
+
+    def test_new_post_queues_thumbnail(self):
+        """new_post режет миниатюру, и карточка показывает её"""
+        ThumbnailsTest.authorized_client.post(reverse('new_post'), {
+            'text': 'С картинкой',
+            'image': self.upload('queued.gif'),
+        })
+        post = Post.objects.get(text='С картинкой')
+        variants = thumbnails.ready(post)
+        self.assertIsNotNone(variants)
+        self.assertEqual((variants['width'], variants['height']), (960, 339))
+        response = ThumbnailsTest.authorized_client.get(reverse('index'))
+        self.assertContains(response, '<img class="card-img"')
+        self.assertContains(response, '480w')
+        self.assertContains(response, 'width="960" height="339"')
+
+    def test_placeholder_until_thumbnail_is_ready(self):
+        """Пока миниатюры нет, карточка показывает заглушку"""
+        post = Post.objects.create(
+            text='Без миниатюры',
+            author=ThumbnailsTest.user,
+            image=self.upload('cold.gif'),
+        )
+        self.assertIsNone(thumbnails.ready(post))
+        response = ThumbnailsTest.authorized_client.get(reverse('index'))
+        self.assertNotContains(response, '<img class="card-img"')
+        self.assertContains(response, 'card-img bg-light')
+        post.refresh_from_db()
+        self.assertIsNotNone(thumbnails.ready(post))
+
+    def test_warm_thumbnails_command(self):
+        post = Post.objects.create(
+            text='Старый пост',
+            author=ThumbnailsTest.user,
+            image=self.upload('old.gif'),
+        )
+        call_command('warm_thumbnails', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertIsNotNone(thumbnails.ready(post))
+
+    def test_new_image_replaces_derivatives(self):
+        """Смена картинки в post_edit готовит новые размеры"""
+        post = Post.objects.create(
+            text='Пост', author=ThumbnailsTest.user,
+            image=self.upload('first.gif'),
+        )
+        thumbnails.generate(post.id, post.image.name)
+        ThumbnailsTest.authorized_client.post(
+            reverse('post_edit', kwargs={
+                'username': ThumbnailsTest.user.username, 'post_id': post.id,
+            }),
+            {'text': 'Пост', 'image': self.upload('second.gif')},
+        )
+        post.refresh_from_db()
+        variants = thumbnails.ready(post)
+        self.assertEqual(variants['image'], post.image.name)
+        self.assertIn('second', variants['sources'][0]['files'][0]['name'])
+
+    def test_broken_image_is_not_queued_again(self):
+        """Битая картинка помечается и больше не ставится в очередь"""
+        post = Post.objects.create(
+            text='Битая картинка',
+            author=ThumbnailsTest.user,
+            image=SimpleUploadedFile(
+                name='broken.gif', content=b'not an image',
+                content_type='image/gif',
+            ),
+        )
+        with self.assertLogs('posts.thumbnails', 'ERROR'):
+            ThumbnailsTest.authorized_client.get(reverse('index'))
+        post.refresh_from_db()
+        self.assertTrue(thumbnails.failed(post))
+        self.assertIsNone(thumbnails.ready(post))
+        cache.clear()
+        with mock.patch.object(thumbnails, 'generate') as generate:
+            response = ThumbnailsTest.authorized_client.get(reverse('index'))
+        generate.assert_not_called()
+        self.assertContains(response, 'card-img bg-light')
@@ -0,0 +1,78 @@
+import struct
+import tracemalloc
+import zlib
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+
+from posts.forms import PostForm
+from posts.uploads import BoundedUploadHandler
+
+
+def png_header(width, height):
+    """PNG, у которого заявлен размер width x height, а данных нет.
+    Пустой IDAT нужен, чтобы файл прошёл verify() в ImageField."""
+    def chunk(kind, body):
+        crc = zlib.crc32(kind + body)
+        return struct.pack('>I', len(body)) + kind + body + struct.pack(
+            '>I', crc
+        )
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', ihdr) + \
+        chunk(b'IDAT', b'') + chunk(b'IEND', b'')
+
+
+@override_settings(POST_IMAGE_MAX_BYTES=2 ** 20, POST_IMAGE_MAX_PIXELS=10 ** 6)
+class BoundedUploadTest(TestCase):
+    def stream(self, size):
+        handler = BoundedUploadHandler(RequestFactory().post('/'))
+        handler.new_file('image', 'big.gif', 'image/gif', size)
+        chunk = b'\0' * handler.chunk_size
+        start = 0
+        while start < size:
+            handler.receive_data_chunk(chunk, start)
+            start += len(chunk)
+        return handler.file_complete(size)
+
+    def test_memory_stays_bounded_while_streaming(self):
+        """Загрузка в 20 МБ не держится в памяти и не пишется на диск"""
+        tracemalloc.start()
+        try:
+            upload = self.stream(20 * 2 ** 20)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 2 ** 20)
+        self.assertTrue(upload.oversized)
+        upload.seek(0, 2)
+        self.assertEqual(upload.tell(), 0)
+        upload.close()
+
+    def test_oversized_file_is_rejected(self):
+        upload = self.stream(2 * 2 ** 20)
+        form = PostForm(data={'text': 'Пост'}, files={'image': upload})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code, 'too_large')
+        upload.close()
+
+    def test_pixel_bomb_is_rejected_by_header(self):
+        """Огромная по заголовку картинка отклоняется без декодирования"""
+        upload = SimpleUploadedFile(
+            'bomb.png', png_header(2000, 2000), content_type='image/png'
+        )
+        form = PostForm(data={'text': 'Пост'}, files={'image': upload})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors.as_data()['image'][0].code, 'too_many_pixels'
+        )
+
+    def test_decompression_bomb_is_rejected(self):
+        """Заголовок больше порога Pillow отклоняет уже ImageField"""
+        upload = SimpleUploadedFile(
+            'bomb.png', png_header(20000, 20000), content_type='image/png'
+        )
+        form = PostForm(data={'text': 'Пост'}, files={'image': upload})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors.as_data()['image'][0].code, 'invalid_image'
+        )
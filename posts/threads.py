@@ -0,0 +1,124 @@
+"""Ветки ответов на комментарии в виде материализованного пути.
+
+path — id всех предков и самого комментария по 10 цифр, поэтому
+ORDER BY thread, path выдаёт ветки обходом в глубину по индексу
+(thread, path). thread — корень ветки, position — номер комментария в
+ней по времени: первые K ответов нескольких веток берутся одним
+запросом по индексу (thread, position).
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Max, Subquery
+
+from .models import Comment
+
+# post нужен, даже если не выводится: related manager post.comments
+# проставляет каждой строке пост и без post_id дочитывал бы его
+# отдельным запросом на строку.
+FIELDS = ('id', 'post', 'text', 'created', 'depth', 'author__username')
+PLACE_FIELDS = ('thread', 'path', 'depth', 'position')
+
+
+def segment(comment_id):
+    return '{:010d}'.format(comment_id)
+
+
+def place(comment):
+    """Заполняет thread, path, depth и position нового комментария."""
+    parent = comment.parent
+    if parent is None:
+        values = {
+            'thread_id': comment.id,
+            'path': segment(comment.id),
+            'depth': 0,
+            'position': 0,
+        }
+    else:
+        values = {
+            'thread_id': parent.thread_id,
+            'path': parent.path + segment(comment.id),
+            'depth': parent.depth + 1,
+            # Номер считается в том же UPDATE: два ответа в одну ветку
+            # не получат один и тот же position.
+            'position': Subquery(
+                Comment.objects.filter(
+                    thread_id=parent.thread_id
+                ).order_by().values('thread').annotate(
+                    last=Max('position')
+                ).values('last')
+            ) + 1,
+        }
+    Comment.objects.filter(pk=comment.pk).update(**values)
+    for name, value in values.items():
+        setattr(comment, name, value)
+    if parent is not None:
+        comment.refresh_from_db(fields=['position'])
+
+
+def attach(roots, limit=None):
+    """Кладёт каждому корню из roots первые limit ответов его ветки в
+    thread_replies и отмечает more_replies, если ответов больше."""
+    if limit is None:
+        limit = settings.COMMENT_THREAD_PREVIEW
+    roots = list(roots)
+    by_thread = {root.id: root for root in roots}
+    for root in roots:
+        root.thread_replies = []
+        root.more_replies = False
+    if not roots:
+        return roots
+    # Строки идут в порядке индекса (thread, position) без сортировки
+    # в базе; до limit ответов каждой ветки дешевле упорядочить по path
+    # здесь, чем читать всю ветку по индексу (thread, path).
+    replies = Comment.objects.filter(
+        thread_id__in=by_thread, position__gte=1, position__lte=limit + 1,
+    ).select_related('author').only(
+        'thread', 'position', 'path', *FIELDS
+    ).order_by('thread_id', 'position')
+    for reply in replies:
+        root = by_thread[reply.thread_id]
+        if reply.position > limit:
+            root.more_replies = True
+        else:
+            root.thread_replies.append(reply)
+    for root in roots:
+        root.thread_replies.sort(key=lambda reply: reply.path)
+    return roots
+
+
+def replies(post, thread_id):
+    """Все ответы ветки в порядке обхода в глубину. Пути ответов длиннее
+    пути корня и начинаются с него, поэтому path > пути корня отбирает
+    ровно их по индексу (thread, path)."""
+    return post.comments.filter(
+        thread_id=thread_id, path__gt=segment(thread_id)
+    ).select_related('author').only(*FIELDS).order_by('thread_id', 'path')
+
+
+def rebuild(batch_size=1000):
+    """Раскладывает по веткам все комментарии, например после
+    bulk_create. Родитель старше ответа, так что обхода по id хватает;
+    комментарий, чей родитель моложе его самого, становится корнем."""
+    placed = {}
+    positions = Counter()
+    batch = []
+    comments = Comment.objects.only('id', 'parent').order_by('id')
+    for comment in comments.iterator(chunk_size=batch_size):
+        parent = placed.get(comment.parent_id)
+        if parent is None:
+            thread_id, path, depth = comment.id, '', 0
+        else:
+            thread_id, path, depth = parent
+            depth += 1
+        path += segment(comment.id)
+        placed[comment.id] = (thread_id, path, depth)
+        comment.thread_id, comment.path, comment.depth = thread_id, path, depth
+        comment.position = positions[thread_id]
+        positions[thread_id] += 1
+        batch.append(comment)
+        if len(batch) == batch_size:
+            Comment.objects.bulk_update(batch, PLACE_FIELDS)
+            batch = []
+    Comment.objects.bulk_update(batch, PLACE_FIELDS)
+    return len(placed)
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import fragments
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Пропорции карточки прежние, 960x339; ширины — для srcset.
+CARD_RATIO = 339 / 960
+CARD_WIDTHS = (480, 960, 1440)
+# Форматы от лучшего к запасному; последний обязан открываться везде.
+FORMATS = (
+    ('AVIF', 'avif', 'image/avif', {'quality': 50}),
+    ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 6}),
+    ('JPEG', 'jpg', 'image/jpeg', {'quality': 85, 'progressive': True}),
+)
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+        return _executor
+
+
+def _formats():
+    Image.init()
+    return [fmt for fmt in FORMATS if fmt[0] in Image.SAVE]
+
+
+def _widths(source_width):
+    """До 960 растягиваем, как раньше делал upscale; шире — только
+    если исходник позволяет."""
+    return [
+        width for width in CARD_WIDTHS
+        if width <= max(source_width, CARD_WIDTHS[1])
+    ]
+
+
+def _variants(post):
+    if not post.image or not post.image_variants:
+        return None
+    variants = json.loads(post.image_variants)
+    if variants['image'] != post.image.name:
+        return None
+    return variants
+
+
+def ready(post):
+    """Сохранённые производные картинки поста или None, если их нет."""
+    variants = _variants(post)
+    if variants is None or variants.get('failed'):
+        return None
+    return variants
+
+
+def failed(post):
+    """Текущую картинку поста уже не удалось нарезать."""
+    variants = _variants(post)
+    return variants is not None and variants.get('failed', False)
+
+
+def _derivatives(name):
+    with default_storage.open(name) as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    stem = os.path.splitext(os.path.basename(name))[0]
+    folder = os.path.join('posts', 'derivatives')
+    variants = {'image': name, 'sources': []}
+    for fmt, extension, mime, options in _formats():
+        files = []
+        for width in _widths(image.width):
+            height = round(width * CARD_RATIO)
+            resized = ImageOps.fit(
+                image, (width, height), Image.LANCZOS, centering=(0.5, 0.5)
+                )
+            buffer = BytesIO()
+            resized.save(buffer, fmt, **options)
+            path = default_storage.save(
+                os.path.join(folder, f'{stem}-{width}.{extension}'),
+                ContentFile(buffer.getvalue()),
+            )
+            files.append({'name': path, 'width': width, 'height': height})
+        variants['sources'].append({'type': mime, 'files': files})
+    fallback = variants['sources'][-1]['files']
+    main = next(
+        (item for item in fallback if item['width'] == CARD_WIDTHS[1]),
+        fallback[-1],
+    )
+    variants.update(width=main['width'], height=main['height'])
+    return variants
+
+
+def _names(variants):
+    return [
+        item['name']
+        for source in variants['sources'] for item in source['files']
+    ]
+
+
+def generate(post_id, name):
+    """Один раз режет все размеры и форматы картинки и сохраняет их
+    в посте; карточка поста после этого рендерится заново."""
+    try:
+        variants = _derivatives(name)
+        old = Post.objects.filter(pk=post_id).values_list(
+            'image_variants', flat=True
+            ).first()
+        updated = Post.objects.filter(pk=post_id, image=name).update(
+            image_variants=json.dumps(variants), updated=timezone.now()
+            )
+        if not updated:
+            # Пока резали, картинку в посте успели сменить.
+            stale = _names(variants)
+        elif old:
+            stale = _names(json.loads(old))
+        else:
+            stale = []
+        for path in stale:
+            default_storage.delete(path)
+        fragments.bump_posts()
+    except Exception:
+        logger.exception('Не удалось подготовить картинку %s', name)
+        # Отметка в посте, а не в памяти процесса: card_image не будет
+        # ставить битый файл в очередь при каждом показе карточки.
+        # Повторить попытку можно командой warm_thumbnails.
+        Post.objects.filter(pk=post_id, image=name).update(
+            image_variants=json.dumps({'image': name, 'failed': True})
+            )
+    finally:
+        with _lock:
+            _pending.discard(name)
+
+
+def _run(post_id, name):
+    try:
+        generate(post_id, name)
+    finally:
+        connection.close()
+
+
+def queue(post):
+    """Ставит картинку поста в очередь пула воркеров, один раз на файл."""
+    if not post.image or failed(post):
+        return
+    name = post.image.name
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    if settings.THUMBNAIL_ASYNC:
+        _pool().submit(_run, post.id, name)
+    else:
+        generate(post.id, name)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл кусками по chunk_size, ничего
+    не держит в памяти целиком и бросает запись, как только файл
+    перерос POST_IMAGE_MAX_BYTES. Такой файл помечается oversized,
+    и форма отклоняет его, не открывая."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.oversized:
+            return None
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_BYTES:
+            self.oversized = True
+            self.file.seek(0)
+            self.file.truncate()
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.oversized = self.oversized
+        return file
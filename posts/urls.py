@@ -1,12 +1,21 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 urlpatterns = [
      path('', views.index, name='index'),
      path('group/<slug:slug>/', views.group_posts, name='group'),
      path('new/', views.new_post, name='new_post'),
      path('follow/', views.follow_index, name='follow_index'),
+     path('search/', views.search, name='search'),
+     path('tags/<str:name>/', views.tag_posts, name='tag'),
+     path('mentions/', views.mentions, name='mentions'),
+     path('api/posts/', api.index, name='api_index'),
+     path('api/group/<slug:slug>/', api.group, name='api_group'),
+     path('api/follow/', api.follow, name='api_follow'),
+     path('api/users/<str:username>/', api.profile, name='api_profile'),
+     path('api/users/<str:username>/<int:post_id>/', api.post,
+          name='api_post'),
      path('<str:username>/follow/',
           views.profile_follow,
           name='profile_follow'),
@@ -15,6 +24,8 @@ urlpatterns = [
           name='profile_unfollow'),
      path('<str:username>/', views.profile, name='profile'),
      path('<str:username>/<int:post_id>/', views.post_view, name='post'),
+     path('<str:username>/<int:post_id>/comments/', views.post_comments,
+          name='post_comments'),
      path('<str:username>/<int:post_id>/edit/',
           views.post_edit, name='post_edit'),
      path('<username>/<int:post_id>/comment', views.add_comment,
@@ -1,40 +1,77 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import IntegrityError, router, transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 
+from . import (
+    concurrency, conditional, counters, feed, fragments, fulltext, threads,
+    thumbnails,
+)
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
+from .models import Follow, Group, Post, Tag
+from .paginator import CursorPaginator, paginate
+from .signals import follow_deleted
 
 User = get_user_model()
 
 
+@conditional.feed
 def index(request):
-    posts = Post.objects.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(
-        request, 'index.html',
-        {'page': page, 'paginator': paginator}
-        )
+    posts = feed.posts()
+    return render(request, 'index.html', {
+        **paginate(request, posts, 10),
+        **fragments.feed_cache(),
+        })
 
 
+@conditional.feed
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.group_posts.all()
-    paginator = Paginator(posts, 2)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    posts = feed.posts(group.group_posts.all())
     return render(
         request, 'group.html', {
-            'page': page,
-            'paginator': paginator,
+            **paginate(request, posts, 2),
+            **fragments.feed_cache(),
             'group': group,
             }
         )
 
 
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts = feed.posts(tag.posts.all())
+    return render(request, 'feed.html', {
+        **paginate(request, posts, 10),
+        **fragments.feed_cache(),
+        'feed_name': 'tag:{}'.format(tag.id),
+        'title': '#{}'.format(tag.name),
+        })
+
+
+@login_required
+def mentions(request):
+    posts = feed.posts(request.user.mentioned_in.all())
+    return render(request, 'feed.html', {
+        **paginate(request, posts, 10),
+        **fragments.feed_cache(),
+        'feed_name': 'mentions',
+        'title': 'Упоминания @{}'.format(request.user.username),
+        })
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = fulltext.SearchPaginator(query, 10)
+    return render(request, 'search.html', {
+        'query': query,
+        'page': paginator.get_page(request.GET.get('cursor')),
+        'paginator': paginator,
+        })
+
+
 @login_required
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -42,52 +79,97 @@ def new_post(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        thumbnails.queue(post)
         return redirect('index')
     return render(request, 'new.html', {'form': form})
 
 
+@conditional.profile
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts = author.author_posts.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    following = Follow.objects.filter(
-        author=author,
-        user=request.user.id
-        ).exists()
-    follower = Follow.objects.filter(author=author).count()
-    follows = Follow.objects.filter(user=author).count()
+    posts = feed.posts(author.author_posts.all())
+    viewer = request.user.id
+    following, stats = concurrency.gather(
+        lambda: Follow.objects.filter(author=author, user=viewer).exists(),
+        lambda: counters.stats_for(author),
+        )
     return render(request, 'profile.html', {
+        **paginate(request, posts, 10),
+        **fragments.feed_cache(),
         'author': author,
-        'page': page,
-        'paginator': paginator,
-        'posts_count': author.author_posts.count(),
+        'posts_count': stats.posts_count,
         'following': following,
-        'follower': follower,
-        'follows': follows,
+        'follower': stats.followers_count,
+        'follows': stats.following_count,
     })
 
 
+@conditional.post
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
-    comments = post.comments.all()
-    form = CommentForm(request.POST or None)
-    following = Follow.objects.filter(
-        author=post.author,
-        user=request.user.id
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'),
+        author__username=username, id=post_id
         )
-    follower = Follow.objects.filter(author=post.author).count()
-    follows = Follow.objects.filter(user=post.author).count()
+    viewer = request.user.id
+    comments_page, following, stats = concurrency.gather(
+        lambda: _comments_page(request, post),
+        lambda: Follow.objects.filter(
+            author=post.author, user=viewer
+            ).exists(),
+        lambda: counters.stats_for(post.author),
+        )
+    form = CommentForm(request.POST or None)
     return render(request, 'post.html', {
         'author': post.author,
         'post': post,
-        'posts_count': post.author.author_posts.count(),
-        'comments': comments,
+        'posts_count': stats.posts_count,
+        'comments': comments_page.object_list,
+        'comments_page': comments_page,
         'form': form,
         'following': following,
-        'follower': follower,
-        'follows': follows,
+        'follower': stats.followers_count,
+        'follows': stats.following_count,
+        })
+
+
+def _comments_page(request, post):
+    """Страница веток от новых к старым; ?comments= — курсор. К каждой
+    ветке одним запросом подгружаются её первые ответы."""
+    paginator = CursorPaginator(
+        post.comments.filter(depth=0).select_related('author').only(
+            *threads.FIELDS
+        ),
+        settings.COMMENTS_PER_PAGE,
+        ordering=('-created', '-id'),
+    )
+    page = paginator.get_page(request.GET.get('comments'))
+    threads.attach(page)
+    return page
+
+
+def post_comments(request, username, post_id):
+    """Следующая страница веток для подгрузки при прокрутке, а с
+    ?thread= — все ответы одной ветки."""
+    post = get_object_or_404(
+        Post.objects.only('id'), author__username=username, id=post_id
+        )
+    thread_id = request.GET.get('thread')
+    if thread_id is not None:
+        if not thread_id.isdigit():
+            raise Http404
+        return JsonResponse({
+            'html': render_to_string(
+                'includes/comment_replies.html',
+                {'replies': threads.replies(post, int(thread_id))}, request
+            ),
+            'next': None,
+            })
+    comments = _comments_page(request, post)
+    return JsonResponse({
+        'html': render_to_string(
+            'includes/comment_items.html', {'comments': comments}, request
+        ),
+        'next': comments.next_cursor(),
         })
 
 
@@ -107,6 +189,8 @@ def post_edit(request, username, post_id):
                 {'form': form, 'post': post}
                 )
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.queue(post)
         return redirect('post', post.author.username, post_id)
     return redirect('post', post.author.username, post_id)
 
@@ -124,43 +208,69 @@ def server_error(request):
     return render(request, 'misc/500.html', status=500)
 
 
+def _reply_parent(request, post):
+    """Комментарий, на который отвечают: parent из формы или ?reply= из
+    ссылки «Ответить». Отвечать можно только в том же посте; глубже
+    COMMENT_MAX_DEPTH ответ встаёт рядом с родителем."""
+    parent_id = request.POST.get('parent') or request.GET.get('reply')
+    if not parent_id:
+        return None
+    if not parent_id.isdigit():
+        raise Http404
+    parent = get_object_or_404(post.comments, id=parent_id)
+    if parent.depth >= settings.COMMENT_MAX_DEPTH:
+        return parent.parent
+    return parent
+
+
 @login_required
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, id=post_id)
+    parent = _reply_parent(request, post)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.post = post
         comment.author = request.user
+        comment.parent = parent
         comment.save()
     return redirect('post', username=username, post_id=post_id)
 
 
 @login_required
+@conditional.follow_feed
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(
-        request, 'follow.html',
-        {'page': page, 'paginator': paginator}
-        )
+    posts = feed.follow_feed(request.user)
+    return render(request, 'follow.html', {
+        **paginate(request, posts, 10),
+        **fragments.feed_cache(request.user),
+        })
 
 
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    follow = Follow.objects.filter(user=request.user, author=author).exists()
-    if not follow and author != request.user:
-        Follow.objects.create(user=request.user, author=author)
+    if author != request.user:
+        try:
+            with transaction.atomic():
+                Follow.objects.create(user=request.user, author=author)
+        except IntegrityError:
+            pass
     return redirect('profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    follow = Follow.objects.filter(user=request.user, author=author)
-    if follow:
-        follow.delete()
+    # Один DELETE без SELECT и сигналов: при параллельных кликах
+    # последствия применяет только тот, кто действительно удалил строку.
+    # Публичный delete() сначала выбирает строки и не возвращает число
+    # удалённых самим DELETE, поэтому берём _raw_delete: у Follow нет
+    # каскадов, которые он бы пропустил. Удаление и последствия в одной
+    # транзакции, как в profile_follow: счётчики не разойдутся.
+    using = router.db_for_write(Follow)
+    follows = Follow.objects.filter(user=request.user, author=author)
+    with transaction.atomic(using=using):
+        if follows._raw_delete(using):
+            follow_deleted(request.user.id, author.id)
     return redirect('profile', username)
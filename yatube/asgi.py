@@ -0,0 +1,12 @@
+"""Точка входа ASGI: uvicorn yatube.asgi:application.
+
+В Django 2.2 своего ASGI-обработчика нет, поэтому приложение WSGI
+обёрнуто в asgiref: сервер держит соединения асинхронно, а сами виды
+выполняются в пуле потоков. Сравнить с WSGI помогает
+python manage.py load_test.
+"""
+from asgiref.wsgi import WsgiToAsgi
+
+from .wsgi import application as wsgi_application
+
+application = WsgiToAsgi(wsgi_application)
@@ -1,17 +1,31 @@
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-SECRET_KEY = ')z0r166#(ab(sv%-w^(vi+cma2l$ca23y5r*k3)+1ablu%)-x-'
+# Профиль окружения: development (по умолчанию) или production.
+# В production включены постоянные соединения с БД, кэш шаблонов и
+# WAL для SQLite; posts.checks проверяет это при старте.
+PROFILE = os.environ.get('YATUBE_PROFILE', 'development')
+PRODUCTION = PROFILE == 'production'
+# Под manage.py test и pytest: фоновые потоки, кэш и журналы не должны
+# трогать данные разработчика.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
 
-DEBUG = True
+# Ключ из репозитория годится только для разработки: в production
+# posts.checks требует YATUBE_SECRET_KEY.
+DEVELOPMENT_SECRET_KEY = ')z0r166#(ab(sv%-w^(vi+cma2l$ca23y5r*k3)+1ablu%)-x-'
+SECRET_KEY = os.environ.get('YATUBE_SECRET_KEY', DEVELOPMENT_SECRET_KEY)
+
+DEBUG = not PRODUCTION
 
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
     '[::1]',
     'testserver',
-]
+] + [host for host in os.environ.get('YATUBE_ALLOWED_HOSTS', '').split(',')
+     if host]
 
 INSTALLED_APPS = [
     'users',
@@ -28,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'posts.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,6 +50,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'posts.routing.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -58,15 +74,49 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 600 if PRODUCTION else 0,
+        # Секунды ожидания блокировки записи (busy_timeout SQLite).
+        'OPTIONS': {'timeout': 20},
     }
 }
 
+# journal_mode=WAL: читатели не ждут писателя.
+SQLITE_WAL = PRODUCTION
+
+# Реплики только для чтения: YATUBE_REPLICAS — имена баз через запятую
+# (для проверки локально годятся копии db.sqlite3). В тестах реплики
+# смотрят в ту же базу, что и default.
+REPLICA_DATABASES = []
+for index, name in enumerate(
+        filter(None, os.environ.get('YATUBE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'], 'NAME': name, 'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['posts.routing.ReplicaRouter']
+REPLICA_VIEWS = (
+    'index', 'group', 'profile', 'post', 'post_comments', 'follow_index',
+    'api_index', 'api_group', 'api_profile', 'api_post', 'api_follow',
+)
+REPLICA_PIN_COOKIE = 'primary_pin'
+REPLICA_PIN_SECONDS = 15
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -82,11 +132,40 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
-CACHES = {
-    'default': {
+# Кэш общий для всех воркеров: YATUBE_CACHE_BACKEND выбирает бэкенд.
+# file и db — локальная замена для разработки, memcached — для
+# продакшена, locmem — только один процесс. Тесты по умолчанию берут
+# locmem: cache.clear() в них не стирает кэш разработчика, а версии
+# лент не переходят из прогона в прогон.
+CACHE_BACKENDS = {
+    'locmem': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
-} 
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'YATUBE_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.environ.get('YATUBE_CACHE_LOCATION', 'yatube_cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ.get(
+            'YATUBE_CACHE_LOCATION', '127.0.0.1:11211'
+        ).split(','),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.environ.get(
+        'YATUBE_CACHE_BACKEND', 'locmem' if TESTING else 'file'
+    )],
+}
 
 LANGUAGE_CODE = 'ru'
 
@@ -111,3 +190,78 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 SITE_ID = 1
+
+FEED_FANOUT_LIMIT = 1000
+FEED_BACKFILL_LIMIT = 500
+
+COMMENTS_PER_PAGE = 50
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# Ветки ответов: предел вложенности и сколько ответов ветки видно сразу.
+COMMENT_MAX_DEPTH = 8
+COMMENT_THREAD_PREVIEW = 3
+
+FEED_CACHE_TTL = 60 * 60
+CARD_CACHE_TTL = 60 * 60 * 24
+
+# Независимые запросы профиля и поста — в пуле потоков (posts.concurrency).
+CONCURRENT_LOOKUPS = PRODUCTION
+LOOKUP_WORKERS = 8
+
+# Миниатюры карточек режутся в фоне. В тестах — сразу: поток пула
+# писал бы в базу и MEDIA_ROOT, когда тест уже закончился.
+THUMBNAIL_ASYNC = not TESTING
+THUMBNAIL_WORKERS = 2
+
+# Загрузки всегда идут во временный файл кусками и ограничены по
+# размеру; число пикселей проверяется по заголовку до декодирования.
+FILE_UPLOAD_HANDLERS = ['posts.uploads.BoundedUploadHandler']
+POST_IMAGE_MAX_BYTES = 10 * 2 ** 20
+POST_IMAGE_MAX_PIXELS = 40 * 10 ** 6
+
+# Поиск: FTS5 для SQLite, posts.fulltext.TableBackend для других баз.
+SEARCH_BACKEND = os.environ.get(
+    'YATUBE_SEARCH_BACKEND', 'posts.fulltext.FTS5Backend'
+)
+
+# Замеры запросов в заголовках X-* и Server-Timing; гистограммы по
+# URL доступны администратору на /admin/instrumentation/.
+INSTRUMENTATION_HEADERS = DEBUG
+
+# Журнал медленных и повторяющихся запросов к БД; сводка —
+# python manage.py query_report.
+SLOW_QUERY_MS = 100
+DUPLICATE_QUERY_THRESHOLD = 2
+LOG_DIR = os.path.join(BASE_DIR, 'logs')
+SLOW_QUERY_LOG = os.path.join(LOG_DIR, 'queries.log')
+
+QUERY_LOG_HANDLER = {
+    'class': 'posts.instrumentation.QueryLogHandler',
+    'filename': SLOW_QUERY_LOG,
+    'maxBytes': 5 * 2 ** 20,
+    'backupCount': 5,
+    'encoding': 'utf-8',
+    'formatter': 'message',
+}
+if TESTING:
+    # Запросы тестов не место в журнале, который читает query_report.
+    QUERY_LOG_HANDLER = {'class': 'logging.NullHandler'}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'queries': QUERY_LOG_HANDLER,
+    },
+    'loggers': {
+        'posts.queries': {
+            'handlers': ['queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
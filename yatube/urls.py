@@ -5,6 +5,8 @@ from django.conf.urls import handler404, handler500
 from django.conf import settings
 from django.conf.urls.static import static
 
+from posts import instrumentation
+
 handler404 = 'posts.views.page_not_found'
 handler500 = 'posts.views.server_error'
 
@@ -15,6 +17,8 @@ urlpatterns = [
           name='about-author'),
      path('about-spec/', views.flatpage, {'url': '/about-spec/'},
           name='about-spec'),
+     path('admin/instrumentation/', instrumentation.report,
+          name='instrumentation'),
      path('admin/', admin.site.urls),
      path('auth/', include('users.urls')),
      path('auth/', include('django.contrib.auth.urls')),
@@ -1,7 +1,16 @@
 import os
 
+from django.conf import settings
+from django.core.management import call_command
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# runserver проверяет настройки сам, а gunicorn и uwsgi — нет:
+# воркер с ошибкой в профиле production не поднимется. Проверки с
+# тегом database (WAL и busy_timeout) Django сам не запускает.
+if not settings.DEBUG:
+    call_command('check')
+    call_command('check', tags=['database'])